@@ -1,13 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.api.v1.endpoints import health
 from app.api.v1.endpoints import users
 from app.api.v1.endpoints import auth
+from app.api.v1.endpoints import admin
+from app.core.config import settings
+from app.dependencies.deadline import request_deadline
 
 api_router = APIRouter()
 
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+# reports scanning the users table get more time than the default deadline
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(request_deadline(settings.ADMIN_REQUEST_DEADLINE_MS))]
+)
 
 # This is the main API router that includes all endpoint routers
\ No newline at end of file
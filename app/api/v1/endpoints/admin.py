@@ -0,0 +1,72 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+
+from app.core.admission import admission
+from app.core.metrics import metrics
+from app.dependencies.auth import authorize
+from app.dependencies.services import get_user_service
+from app.dtos.custom_response_dto import CustomResponse
+from app.models.user import UserRole
+from app.schemas.user import UserResponse
+from app.services.user_replica import user_replica
+from app.services.user_service import UserService
+from app.utils.response import create_response
+
+router = APIRouter()
+
+@router.get(
+    "/metrics",
+    response_model=CustomResponse[Dict[str, Any]],
+    summary="Get metrics",
+    description="Get the in-process metrics of the worker serving the request"
+)
+async def get_metrics(
+    _: UserResponse = Depends(authorize(allowed_roles=[UserRole.ADMIN.value])),
+) -> CustomResponse[Dict[str, Any]]:
+
+    return create_response(
+        data=metrics.snapshot()
+    )
+
+@router.get(
+    "/admission",
+    response_model=CustomResponse[Dict[str, Any]],
+    summary="Get admission control state",
+    description="Get the global adaptive limit and per-client in-flight requests, tokens and counts of the worker serving the request"
+)
+async def get_admission(
+    _: UserResponse = Depends(authorize(allowed_roles=[UserRole.ADMIN.value])),
+) -> CustomResponse[Dict[str, Any]]:
+
+    return create_response(
+        data=admission.snapshot()
+    )
+
+@router.get(
+    "/user-replica",
+    response_model=CustomResponse[Dict[str, Any]],
+    summary="Get user replica memory footprint",
+    description="Get the number of users held by the in-memory user replica of the worker serving the request, its estimated memory use and staleness"
+)
+async def get_user_replica(
+    _: UserResponse = Depends(authorize(allowed_roles=[UserRole.ADMIN.value])),
+) -> CustomResponse[Dict[str, Any]]:
+
+    return create_response(
+        data=user_replica.memory_report()
+    )
+
+@router.get(
+    "/password-costs",
+    response_model=CustomResponse[Dict[str, Any]],
+    summary="Get password hash costs",
+    description="Get the current bcrypt cost factor and the number of users hashed at each cost"
+)
+async def get_password_costs(
+    _: UserResponse = Depends(authorize(allowed_roles=[UserRole.ADMIN.value])),
+    user_service: UserService = Depends(get_user_service)
+) -> CustomResponse[Dict[str, Any]]:
+
+    return create_response(
+        data=await user_service.get_password_cost_report()
+    )
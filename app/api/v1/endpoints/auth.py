@@ -1,18 +1,64 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, status
+import logging
+from datetime import timedelta
+from typing import Annotated, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.core.security import create_access_token, verify_password
-from app.dependencies.services import get_user_service
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    password_needs_rehash,
+    verify_dummy_password_async,
+    verify_password_async,
+)
+from app.db.session import AsyncSessionLocal
+from app.dependencies.services import get_idempotency_repository, get_user_service
 from app.dtos.custom_response_dto import CustomResponse
-from app.exceptions.http_exceptions import BadRequestError, UnauthorizedError
+from app.exceptions.http_exceptions import BadRequestError, ConflictError, UnauthorizedError
 from app.models.user import UserRole
+from app.repositories.idempotency import IdempotencyRepository
 from app.schemas.user import UserCreate, UserLogin, UserResponse
+from app.services.login_activity import login_activity
 from app.services.user_service import UserService
+from app.utils.idempotency import IdempotencyKeyTaken, replay_response, request_fingerprint
 from app.utils.response import create_response
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+REGISTER_SCOPE = "register"
+
+async def upgrade_password_hash(user_id: int, email: str, password: str, previous_hash: str) -> None:
+    """
+    Background task upgrading an outdated password hash after a successful login.
+
+    Runs after the response is sent, with its own database session.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await get_user_service(db).upgrade_password_hash(user_id, email, password, previous_hash)
+    except Exception as e:
+        logger.error("Password hash upgrade failed", extra={"fields": {"user_id": user_id, "error": str(e)}})
+
+def build_token_data(user) -> dict:
+    """Claims identifying the user; role and active flag allow stateless authorization"""
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "role": user.role,
+        "act": user.is_active
+    }
+
+def schedule_password_upgrade(background_tasks: BackgroundTasks, user, password: str) -> None:
+    """Queue a hash upgrade if the user's hash uses outdated settings"""
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(upgrade_password_hash, user.id, user.email, password, user.hashed_password)
+
 @router.post(
     "/register",
     response_model=CustomResponse[UserResponse],
@@ -22,24 +68,66 @@ router = APIRouter()
 )
 async def create_user(
     user_in: UserCreate,
-    user_service: UserService = Depends(get_user_service)
-) -> CustomResponse[UserResponse]:
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-chosen key; retries with the same key replay the first response"
+    ),
+    user_service: UserService = Depends(get_user_service),
+    idempotency_repo: IdempotencyRepository = Depends(get_idempotency_repository)
+):
     
-    existing_user = await user_service.get_by_email(user_in.email)
+    ttl = timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    fingerprint = request_fingerprint(user_in.dict()) if idempotency_key else None
+    if idempotency_key:
+        stored = await idempotency_repo.get_response(REGISTER_SCOPE, idempotency_key, ttl)
+        if stored:
+            return replay_response(stored, fingerprint)
+
+    response_body = None
+
+    async def store_response(user) -> None:
+        # built before commit so the stored and the returned response are the same
+        nonlocal response_body
+        response_body = jsonable_encoder(CustomResponse[UserResponse](
+            data=UserResponse.from_orm(user),
+            message="User created successfully"
+        ))
+        if idempotency_key:
+            saved = await idempotency_repo.save(
+                REGISTER_SCOPE, idempotency_key, fingerprint, status.HTTP_201_CREATED, response_body, ttl,
+                commit_txn=False
+            )
+            if not saved:
+                raise IdempotencyKeyTaken()
+
+    user_in.role = UserRole.USER.value
+    try:
+        user = await user_service.register(user_in, before_commit=store_response)
+    except IdempotencyKeyTaken:
+        # a concurrent request with the same key committed first: drop this user and answer like a retry
+        await idempotency_repo.db.rollback()
+        stored = await idempotency_repo.get_response(REGISTER_SCOPE, idempotency_key, ttl)
+        if stored:
+            return replay_response(stored, fingerprint)
+        raise ConflictError(
+            error_code="IDEMPOTENCY_KEY_REUSED",
+            detail="Idempotency-Key was already used for a different request"
+        )
 
-    if existing_user:
+    if user is None:
+        # a concurrent retry with the same key may have won the insert
+        if idempotency_key:
+            stored = await idempotency_repo.get_response(REGISTER_SCOPE, idempotency_key, ttl)
+            if stored:
+                return replay_response(stored, fingerprint)
         raise BadRequestError(
             error_code="USER_ALREADY_EXISTS",
             detail="User with this email already exists"            
         )
 
-    user_in.role = UserRole.USER.value
-    user = await user_service.create(user_in)
-    return create_response(
-        data=UserResponse.from_orm(user),
-        message="User created successfully",
-        status_code=status.HTTP_201_CREATED
-    )
+    return JSONResponse(status_code=status.HTTP_201_CREATED, content=response_body)
 
 # login
 @router.post(
@@ -51,23 +139,24 @@ async def create_user(
 )
 async def login_user(
     user_in: UserLogin,
+    background_tasks: BackgroundTasks,
     user_service: UserService = Depends(get_user_service)
 ) -> CustomResponse[str]:
     user = await user_service.get_by_email(user_in.email)
 
-    if not user or not verify_password(user_in.password, user.hashed_password):
+    if not user:
+        # as slow as a wrong password: timing doesn't reveal registered emails
+        await verify_dummy_password_async(user_in.password)
+    if not user or not await verify_password_async(user_in.password, user.hashed_password):
         raise UnauthorizedError(
             error_code="INVALID_CREDENTIALS",
             detail="Invalid email or password"
         )
-    
-    user_dict = {
-        "email": user.email,
-        "first_name": user.first_name,
-        "last_name": user.last_name
-    }
 
-    token = create_access_token(data=user_dict)
+    schedule_password_upgrade(background_tasks, user, user_in.password)
+    login_activity.record(user.id)
+    
+    token = create_access_token(data=build_token_data(user))
 
     return create_response(
         data=token,
@@ -79,22 +168,23 @@ async def login_user(
 @router.post("/token")
 async def generate_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    background_tasks: BackgroundTasks,
     user_service: UserService = Depends(get_user_service)
 ):
     user = await user_service.get_by_email(form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
+        # as slow as a wrong password: timing doesn't reveal registered emails
+        await verify_dummy_password_async(form_data.password)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise UnauthorizedError(
             error_code="INVALID_CREDENTIALS",
             detail="Invalid email or password"
         )
-    
-    user_dict = {
-        "email": user.email,
-        "first_name": user.first_name,
-        "last_name": user.last_name
-    }
 
-    token = create_access_token(data=user_dict)
+    schedule_password_upgrade(background_tasks, user, form_data.password)
+    login_activity.record(user.id)
+    
+    token = create_access_token(data=build_token_data(user))
 
     return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.db.session import get_db
-from app.utils.common import log_error
+from app.exceptions.http_exceptions import ServiceUnavailableError
 from app.utils.response import create_response
 
 router = APIRouter()
@@ -14,7 +14,7 @@ router = APIRouter()
     summary="Health check endpoint",
     description="Simple health check endpoint to verify the API is running",
 )
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """
     Health check endpoint.
     
@@ -27,13 +27,10 @@ def health_check(db: Session = Depends(get_db)):
     Returns:
         Success response with health status
     """
-    # Log this operation
-    log_error("Health check performed")
-    
     # Try to connect to the database
     try:
         # Simple statement to test database connectivity using SQLAlchemy text()
-        result = db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "connected"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -48,4 +45,31 @@ def health_check(db: Session = Depends(get_db)):
     return create_response(
         data=data,
         message="Health check successful"
-    )
\ No newline at end of file
+    )
+
+@router.get(
+    "/ready",
+    status_code=status.HTTP_200_OK,
+    summary="Readiness check endpoint",
+    description="Reports whether the startup warm-up has finished and the instance should receive traffic",
+)
+async def readiness_check(request: Request):
+    """
+    Readiness check endpoint.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        Success response once warm-up finished
+
+    Raises:
+        ServiceUnavailableError: While the application is still warming up
+    """
+    if not getattr(request.app.state, "ready", False):
+        raise ServiceUnavailableError(detail="Service is warming up", error_code="NOT_READY")
+
+    return create_response(
+        data={"status": "ready"},
+        message="Service is ready"
+    )
@@ -1,65 +1,108 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Request, status
 
 from app.dependencies.auth import authorize, get_current_active_user
+from app.dependencies.fields import sparse_fields
 from app.dependencies.services import get_user_service
 from app.dtos.custom_response_dto import CustomResponse
 from app.exceptions.http_exceptions import BadRequestError
-from app.models.user import UserRole
-from app.schemas.user import UserCreate, UserResponse
+from app.models.user import User, UserRole
+from app.schemas.user import (
+    UserCreate,
+    UserLookupRequest,
+    UserResponse,
+    optional_user_rows_adapter,
+    user_rows_adapter,
+)
 from app.services.user_service import UserService
-from app.utils.response import create_response
+from app.utils.conditional import (
+    is_not_modified,
+    not_modified_response,
+    resource_version,
+    wants_validation,
+    with_validators,
+)
+from app.utils.response import create_response, create_serialized_response
 
 router = APIRouter()
 
+# fields selectable with ?fields=, never anything outside the public representation
+user_fields = sparse_fields(list(UserResponse.model_fields))
+response_fields = tuple(UserResponse.model_fields)
+
 @router.get(
     "/me",
     response_model=CustomResponse[UserResponse],
     summary="Get current user",
-    description="Get the currently authenticated user"
+    description="Get the currently authenticated user",
+    responses={304: {"description": "Not modified"}}
 )
 async def get_current_user(
+    request: Request,
     current_user: UserResponse = Depends(authorize()),
+    user_service: UserService = Depends(get_user_service)
 ) -> CustomResponse[UserResponse]:
 
-    return create_response(
+    # stateless auth only carries the token claims
+    if not isinstance(current_user, User):
+        current_user = await user_service.get(current_user.id)
+        if current_user is None:
+            return create_response(
+                data=None
+            )
+
+    version = resource_version(current_user.id, current_user.updated_at)
+    if is_not_modified(request, version):
+        return not_modified_response(version)
+
+    response = create_response(
         data=UserResponse.from_orm(current_user)
     )
+    return with_validators(response, version)
 
 @router.get(
     "/",    
     response_model=CustomResponse[List[UserResponse]],
     summary="Get all users",
-    description="Get a list of users"    
+    description="Get a list of users; ?fields= returns only the listed fields"    
 )
 async def get_users(
     _: UserResponse = Depends(authorize(allowed_roles=[UserRole.ADMIN.value])),
+    fields: Optional[Tuple[str, ...]] = Depends(user_fields),
     user_service: UserService = Depends(get_user_service)
 ) -> CustomResponse[List[UserResponse]]:
 
-    users = await user_service.get_all_users()
+    # rows are read with Core and serialized in bulk, no ORM instances involved
+    users = await user_service.get_all_users_fields(fields or response_fields)
 
-    if not users:
-        return create_response(
-            data=None
-        )
-    
-    return create_response(
-        data=[UserResponse.from_orm(user) for user in users]
-    )  
+    # sparse rows go out as they are, full rows through the response row adapter
+    return create_serialized_response(
+        data=users or None,
+        adapter=None if fields else user_rows_adapter
+    )
 
 @router.get(
     "/by-email",
     response_model=CustomResponse[UserResponse],
     summary="Get user by email",
-    description="Get a user by their email address"
+    description="Get a user by their email address",
+    responses={304: {"description": "Not modified"}}
 )
 async def get_user_by_email(
     email: str,
+    request: Request,
     _: UserResponse = Depends(authorize(allowed_roles=[UserRole.USER.value])),
     user_service: UserService = Depends(get_user_service)
 ) -> CustomResponse[UserResponse]:
 
+    # validate against the cheap (id, updated_at) projection before loading the row
+    if wants_validation(request):
+        current = await user_service.get_version_by_email(email)
+        if current:
+            version = resource_version(*current)
+            if is_not_modified(request, version):
+                return not_modified_response(version)
+
     user = await user_service.get_by_email(email)
 
     if not user:
@@ -67,22 +110,53 @@ async def get_user_by_email(
             data=None
         )
     
-    return create_response(
+    response = create_response(
         data=UserResponse.from_orm(user)
     )
+    return with_validators(response, resource_version(user.id, user.updated_at))
+
+@router.post(
+    "/lookup",
+    response_model=CustomResponse[List[Optional[UserResponse]]],
+    summary="Get users by IDs",
+    description="Get several users in one request; results follow the order of the requested IDs, null where not found. ?fields= returns only the listed fields"
+)
+async def lookup_users(
+    lookup_in: UserLookupRequest,
+    _: UserResponse = Depends(authorize(allowed_roles=[UserRole.USER.value, UserRole.ADMIN.value])),
+    fields: Optional[Tuple[str, ...]] = Depends(user_fields),
+    user_service: UserService = Depends(get_user_service)
+) -> CustomResponse[List[Optional[UserResponse]]]:
+
+    users = await user_service.get_many_fields(lookup_in.ids, fields or response_fields)
+
+    return create_serialized_response(
+        data=users,
+        adapter=None if fields else optional_user_rows_adapter
+    )
 
 @router.get(
     "/{id}",
     response_model=CustomResponse[UserResponse],
     summary="Get user by ID",
-    description="Get a user by their ID"
+    description="Get a user by their ID",
+    responses={304: {"description": "Not modified"}}
 )
 async def get_user_by_id(
     id: int,
+    request: Request,
     _: UserResponse = Depends(authorize(allowed_roles=[UserRole.USER.value, UserRole.ADMIN.value])),
     user_service: UserService = Depends(get_user_service)
 ) -> CustomResponse[UserResponse]:
 
+    # validate against updated_at alone before loading the row
+    if wants_validation(request):
+        updated_at = await user_service.get_updated_at(id)
+        if updated_at is not None:
+            version = resource_version(id, updated_at)
+            if is_not_modified(request, version):
+                return not_modified_response(version)
+
     user = await user_service.get(id)
 
     if not user:
@@ -90,6 +164,7 @@ async def get_user_by_id(
             data=None
         )
     
-    return create_response(
+    response = create_response(
         data=UserResponse.from_orm(user)
     )
+    return with_validators(response, resource_version(user.id, user.updated_at))
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from app.cache.backends import CacheBackend, MemoryCacheBackend
+from app.cache.read_through import ReadThroughCache
+from app.core.config import settings
+
+_user_cache: Optional[ReadThroughCache] = None
+_user_cache_configured = False
+
+def configure_user_cache(backend: Optional[CacheBackend]) -> Optional[ReadThroughCache]:
+    """
+    Install the backend used for user lookups.
+
+    Call at startup to use a shared store instead of the in-process default;
+    pass None to disable caching.
+
+    Args:
+        backend: Cache backend, or None to disable caching
+
+    Returns:
+        The configured cache, or None if caching is disabled
+    """
+    global _user_cache, _user_cache_configured
+    _user_cache = ReadThroughCache(
+        backend,
+        name="user_cache",
+        ttl=settings.USER_CACHE_TTL_SECONDS,
+        negative_ttl=settings.USER_CACHE_NEGATIVE_TTL_SECONDS
+    ) if backend is not None else None
+    _user_cache_configured = True
+    return _user_cache
+
+def get_user_cache() -> Optional[ReadThroughCache]:
+    """Get the process-wide user cache, building it from settings on first use"""
+    if not _user_cache_configured:
+        if settings.USER_CACHE_BACKEND == "memory":
+            configure_user_cache(MemoryCacheBackend(max_entries=settings.USER_CACHE_MAX_ENTRIES, name="user_cache"))
+        else:
+            configure_user_cache(None)
+    return _user_cache
@@ -0,0 +1,153 @@
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from app.core.metrics import metrics
+
+class CacheBackend:
+    """
+    Base class for cache backends.
+
+    Backends store opaque, picklable values with a per-entry TTL.
+    """
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns:
+            Tuple of (found, value)
+        """
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 10000, name: str = "cache"):
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries: Maximum number of entries before least recently used ones are evicted
+            name: Prefix for exported metrics
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._evictions = metrics.counter(f"{name}.evictions", "Entries evicted to respect max_entries")
+        self._expirations = metrics.counter(f"{name}.expirations", "Entries dropped after their TTL")
+        metrics.register_collector(f"{name}.size", lambda: {f"{name}.size": len(self._entries)})
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._expirations.inc()
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+class SharedStore(Protocol):
+    """
+    Minimal client interface of a shared key/value store (e.g. Redis).
+
+    TTLs are expressed in milliseconds, as with Redis PX.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, px: int) -> Any: ...
+
+    async def delete(self, *keys: str) -> Any: ...
+
+class SharedStoreBackend(CacheBackend):
+    """Cache backend storing pickled values in a shared store"""
+
+    def __init__(self, store: SharedStore, namespace: str = "app"):
+        """
+        Initialize the backend.
+
+        Args:
+            store: Shared store client
+            namespace: Key prefix isolating this application's entries
+        """
+        self.store = store
+        self.namespace = namespace
+        # keys written by this process, so clear() can remove them without a SCAN
+        self._known_keys: set = set()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        raw = await self.store.get(self._key(key))
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._known_keys.add(key)
+        await self.store.set(self._key(key), pickle.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            self._known_keys.difference_update(keys)
+            await self.store.delete(*(self._key(key) for key in keys))
+
+    async def clear(self) -> None:
+        await self.delete(*list(self._known_keys))
+
+class LocalSharedStore:
+    """
+    In-memory implementation of SharedStore.
+
+    Stands in for the real shared store in tests and local development.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, px: int) -> bool:
+        self._data[key] = (time.monotonic() + px / 1000, value)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.cache.backends import CacheBackend
+from app.core.metrics import metrics
+
+class ReadThroughCache:
+    """
+    Read-through cache on top of a CacheBackend.
+
+    Misses are cached as well (negative caching) with their own TTL. Concurrent
+    misses for the same key share a single load so a cold key does not stampede
+    the database.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        name: str,
+        ttl: float,
+        negative_ttl: float
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend
+            name: Prefix for exported metrics
+            ttl: Seconds a loaded value stays cached
+            negative_ttl: Seconds a miss stays cached
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # in-flight loads invalidated by a write; their result must not be stored
+        self._stale: Set[str] = set()
+
+        self._hits = metrics.counter(f"{name}.hits", "Lookups answered from the cache")
+        self._negative_hits = metrics.counter(f"{name}.negative_hits", "Lookups answered by a cached miss")
+        self._misses = metrics.counter(f"{name}.misses", "Lookups that loaded from the source")
+        self._coalesced = metrics.counter(f"{name}.coalesced", "Misses that waited on an in-flight load")
+        metrics.register_collector(f"{name}.hit_ratio", lambda: {f"{name}.hit_ratio": self.hit_ratio})
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self._hits.value + self._negative_hits.value
+        total = hits + self._misses.value
+        return hits / total if total else 0.0
+
+    async def peek(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key without loading it on a miss.
+
+        Returns:
+            Tuple of (found, value); a cached miss is reported as (True, None)
+        """
+        found, entry = await self.backend.get(key)
+        if not found:
+            return False, None
+        _, value = entry
+        return True, value
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """
+        Return the cached value for a key, loading and caching it on a miss.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function returning the value, or None if it does not exist
+
+        Returns:
+            Cached or loaded value, None if it does not exist
+        """
+        found, entry = await self.backend.get(key)
+        if found:
+            exists, value = entry
+            (self._hits if exists else self._negative_hits).inc()
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced.inc()
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if inflight.cancelled():
+                    # the loading caller went away; load on our own behalf
+                    return await self.get_or_load(key, loader)
+                raise
+
+        self._misses.inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                # the waiters re-raise it; avoid "exception was never retrieved"
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            stale = key in self._stale
+            self._stale.discard(key)
+
+        future.set_result(value)
+
+        if not stale:
+            if value is None:
+                await self.backend.set(key, (False, None), self.negative_ttl)
+            else:
+                await self.backend.set(key, (True, value), self.ttl)
+
+        return value
+
+    async def invalidate(self, *keys: str) -> None:
+        """Drop keys from the cache, including loads currently in flight"""
+        self._stale.update(key for key in keys if key in self._inflight)
+        await self.backend.delete(*keys)
+
+    async def clear(self) -> None:
+        """Drop every entry"""
+        self._stale.update(self._inflight)
+        await self.backend.clear()
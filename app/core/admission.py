@@ -0,0 +1,228 @@
+import math
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+ANONYMOUS_CLIENT = "anonymous"
+
+class ClientLimits(NamedTuple):
+    max_in_flight: int  # 0 = unlimited
+    rate: float  # requests per second, 0 = unlimited
+    burst: int
+
+class Rejection(NamedTuple):
+    status_code: int
+    reason: str
+    retry_after: int  # seconds
+
+class TokenBucket:
+    """Request rate limit allowing short bursts"""
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """Refill for the time elapsed and return the seconds until a token is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+class AdaptiveLimit:
+    """
+    Global concurrency limit adjusted by AIMD on request latency.
+
+    Each request finishing within the target latency raises the limit by
+    1/limit, i.e. by one per limit's worth of fast requests. A slow request
+    multiplies it by the backoff ratio, at most once per target latency so
+    one burst of slow requests (all admitted under the old limit) doesn't
+    collapse it.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float, backoff: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self._decreased_at = 0.0
+
+    def update(self, latency: float, now: float) -> None:
+        if latency > self.target_latency:
+            if now - self._decreased_at >= self.target_latency:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._decreased_at = now
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+def parse_client_limits(value: str, default: ClientLimits) -> Dict[str, ClientLimits]:
+    """
+    Parse per-client overrides.
+
+    Args:
+        value: Comma separated client:max_in_flight:rate:burst entries;
+            trailing parts may be left out to keep the default
+
+    Returns:
+        Mapping of client ID to its limits
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        client_id, *parts = entry.split(":")
+        max_in_flight = int(parts[0]) if len(parts) > 0 and parts[0] else default.max_in_flight
+        rate = float(parts[1]) if len(parts) > 1 and parts[1] else default.rate
+        burst = int(parts[2]) if len(parts) > 2 and parts[2] else max(default.burst, math.ceil(rate))
+        limits[client_id] = ClientLimits(max_in_flight, rate, burst)
+    return limits
+
+class _ClientState:
+    __slots__ = ("limits", "in_flight", "bucket", "admitted", "rejected")
+
+    def __init__(self, limits: ClientLimits):
+        self.limits = limits
+        self.in_flight = 0
+        self.bucket = TokenBucket(limits.rate, limits.burst) if limits.rate > 0 else None
+        self.admitted = 0
+        self.rejected = 0
+
+class AdmissionController:
+    """
+    Decides whether a request may start, per client and globally.
+
+    Checks, cheapest and most specific first:
+        per-client in-flight requests   429 TOO_MANY_IN_FLIGHT
+        per-client token bucket         429 RATE_LIMITED
+        global adaptive limit           503 OVERLOADED
+
+    State is per worker process, like the connection pool it protects.
+    """
+
+    def __init__(
+        self,
+        default: ClientLimits,
+        overrides: Dict[str, ClientLimits],
+        limit: AdaptiveLimit
+    ):
+        self.default = default
+        self.overrides = overrides
+        self.limit = limit
+        self.in_flight = 0
+        self._clients: Dict[str, _ClientState] = {}
+        self._admitted = metrics.counter("admission.admitted", "Requests admitted")
+        self._rejected = {
+            reason: metrics.counter(f"admission.rejected.{reason.lower()}", f"Requests shed with {reason}")
+            for reason in ("TOO_MANY_IN_FLIGHT", "RATE_LIMITED", "OVERLOADED")
+        }
+        metrics.register_collector("admission.limit", lambda: {
+            "admission.limit": round(self.limit.limit, 2),
+            "admission.in_flight": self.in_flight,
+        })
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        default = ClientLimits(
+            settings.ADMISSION_CLIENT_MAX_IN_FLIGHT,
+            settings.ADMISSION_CLIENT_RATE,
+            settings.ADMISSION_CLIENT_BURST,
+        )
+        return cls(
+            default,
+            parse_client_limits(settings.ADMISSION_CLIENT_LIMITS, default),
+            AdaptiveLimit(
+                initial=settings.ADMISSION_GLOBAL_INITIAL_LIMIT,
+                minimum=settings.ADMISSION_GLOBAL_MIN_LIMIT,
+                maximum=settings.ADMISSION_GLOBAL_MAX_LIMIT,
+                target_latency=settings.ADMISSION_TARGET_LATENCY_MS / 1000,
+                backoff=settings.ADMISSION_BACKOFF_RATIO,
+            ),
+        )
+
+    def _client(self, client_id: str) -> _ClientState:
+        state = self._clients.get(client_id)
+        if state is None:
+            state = self._clients[client_id] = _ClientState(self.overrides.get(client_id, self.default))
+        return state
+
+    def _reject(self, state: _ClientState, status_code: int, reason: str, retry_after: float) -> Rejection:
+        state.rejected += 1
+        self._rejected[reason].inc()
+        return Rejection(status_code, reason, max(1, math.ceil(retry_after)))
+
+    def admit(self, client_id: Optional[str]) -> Optional[Rejection]:
+        """
+        Try to admit a request; an admitted request must be released.
+
+        Args:
+            client_id: X-Client-ID of the request, None if it has none
+
+        Returns:
+            None if admitted, the reason otherwise
+        """
+        state = self._client(client_id or ANONYMOUS_CLIENT)
+        limits = state.limits
+
+        if limits.max_in_flight and state.in_flight >= limits.max_in_flight:
+            return self._reject(state, 429, "TOO_MANY_IN_FLIGHT", 1)
+
+        if state.bucket is not None:
+            wait = state.bucket.wait_time(time.monotonic())
+            if wait:
+                return self._reject(state, 429, "RATE_LIMITED", wait)
+
+        if self.in_flight >= int(self.limit.limit):
+            return self._reject(state, 503, "OVERLOADED", 1)
+
+        # only spend a token once the request is actually admitted
+        if state.bucket is not None:
+            state.bucket.take()
+        state.in_flight += 1
+        state.admitted += 1
+        self.in_flight += 1
+        self._admitted.inc()
+        return None
+
+    def release(self, client_id: Optional[str], latency: float) -> None:
+        """
+        Mark an admitted request finished.
+
+        Args:
+            client_id: Same value as passed to admit
+            latency: Time the request took, in seconds
+        """
+        self._client(client_id or ANONYMOUS_CLIENT).in_flight -= 1
+        self.in_flight -= 1
+        self.limit.update(latency, time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limits and per-client state"""
+        return {
+            "global": {
+                "limit": round(self.limit.limit, 2),
+                "min_limit": self.limit.minimum,
+                "max_limit": self.limit.maximum,
+                "target_latency_ms": self.limit.target_latency * 1000,
+                "in_flight": self.in_flight,
+            },
+            "clients": {
+                client_id: {
+                    "max_in_flight": state.limits.max_in_flight,
+                    "rate": state.limits.rate,
+                    "burst": state.limits.burst,
+                    "in_flight": state.in_flight,
+                    "tokens": round(state.bucket.tokens, 2) if state.bucket is not None else None,
+                    "admitted": state.admitted,
+                    "rejected": state.rejected,
+                }
+                for client_id, state in sorted(self._clients.items())
+            },
+        }
+
+admission = AdmissionController.from_settings()
@@ -16,6 +16,12 @@ class Settings:
     JWT_AUDIENCE: str = os.getenv("JWT_AUDIENCE", "*")
     JWT_ISSUER: str = os.getenv("JWT_ISSUER", "http://localhost:8000")
 
+    # Stateless auth: trust signed role/active claims instead of loading the user per request
+    AUTH_STATELESS: bool = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
+    STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", 5))
+    REVOCATION_MAX_STALENESS_SECONDS: float = float(os.getenv("REVOCATION_MAX_STALENESS_SECONDS", 30))  # older revocation data falls back to DB lookups
+
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
@@ -36,7 +42,131 @@ class Settings:
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "app")
     
+    # Connection pool settings (per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_MIN_REMAINING_MS: float = float(os.getenv("DB_MIN_REMAINING_MS", 50))  # don't start a transaction with less time left
+    # hash partitions of the users table, as set up by migration 0008; 0 = plain table
+    USERS_PARTITIONS: int = int(os.getenv("USERS_PARTITIONS", 0))
+    DB_POOL_BUDGET: int = int(os.getenv("DB_POOL_BUDGET", 0))  # total connections split across workers by app.serve; 0 = use DB_POOL_SIZE as is
+
+    # Warm-up settings (run at startup, /health/ready reports 503 until done)
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    WARMUP_CONNECTIONS: int = int(os.getenv("WARMUP_CONNECTIONS", 0))  # 0 = DB_POOL_SIZE
+    WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", 30))
+
+    # Archival of soft-deleted users
+    USER_ARCHIVE_ENABLED: bool = os.getenv("USER_ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+    USER_ARCHIVE_AFTER_DAYS: int = int(os.getenv("USER_ARCHIVE_AFTER_DAYS", 30))
+    USER_ARCHIVE_BATCH_SIZE: int = int(os.getenv("USER_ARCHIVE_BATCH_SIZE", 500))
+    USER_ARCHIVE_BATCH_PAUSE_MS: int = int(os.getenv("USER_ARCHIVE_BATCH_PAUSE_MS", 200))
+    USER_ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("USER_ARCHIVE_INTERVAL_SECONDS", 600))
+
+    # Background jobs; enable once handlers for the enqueued job types are registered
+    JOBS_ENABLED: bool = os.getenv("JOBS_ENABLED", "false").lower() in ("1", "true", "yes")
+    JOB_POLL_INTERVAL_MS: int = int(os.getenv("JOB_POLL_INTERVAL_MS", 1000))
+    JOB_BACKOFF_BASE_SECONDS: float = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", 5))
+    JOB_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", 3600))
+    JOB_LOCK_TIMEOUT_SECONDS: int = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", 600))  # running longer means the runner died
+    JOB_SHUTDOWN_TIMEOUT_SECONDS: float = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", 20))
+
+    # Login activity (last_login_at / login_count), written behind in batches
+    LOGIN_ACTIVITY_FLUSH_SECONDS: float = float(os.getenv("LOGIN_ACTIVITY_FLUSH_SECONDS", 5))
+    LOGIN_ACTIVITY_MAX_PENDING: int = int(os.getenv("LOGIN_ACTIVITY_MAX_PENDING", 10000))  # distinct users buffered
+    LOGIN_ACTIVITY_BATCH_SIZE: int = int(os.getenv("LOGIN_ACTIVITY_BATCH_SIZE", 1000))  # rows per UPDATE statement
+
+    # Stored responses for Idempotency-Key headers
+    IDEMPOTENCY_KEY_TTL_HOURS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+    # Server settings (python -m app.serve)
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", 8000))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0))  # worker processes; 0 = one per CPU
+    GRACEFUL_SHUTDOWN_SECONDS: int = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", 30))
+    HASHING_POOL_SIZE: int = int(os.getenv("HASHING_POOL_SIZE", os.cpu_count() or 1))  # bcrypt threads per worker
+
     CLIENT_IDS: str = os.getenv("CLIENT_IDS", "")
+
+    # Request deadlines, passed on to Postgres as statement_timeout
+    REQUEST_DEADLINE_MS: float = float(os.getenv("REQUEST_DEADLINE_MS", 10000))
+    ADMIN_REQUEST_DEADLINE_MS: float = float(os.getenv("ADMIN_REQUEST_DEADLINE_MS", 60000))
+
+    # How far before their watermark incremental syncs re-read changed rows: writes are stamped
+    # when their transaction starts and commit up to a request deadline later
+    SYNC_OVERLAP_SECONDS: float = float(os.getenv("SYNC_OVERLAP_SECONDS", REQUEST_DEADLINE_MS / 1000))
+
+    # Admission control: requests over a limit are shed before auth and the database
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    ADMISSION_CLIENT_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_CLIENT_MAX_IN_FLIGHT", 32))  # per client and worker; 0 = unlimited
+    ADMISSION_CLIENT_RATE: float = float(os.getenv("ADMISSION_CLIENT_RATE", 100))  # requests per second; 0 = unlimited
+    ADMISSION_CLIENT_BURST: int = int(os.getenv("ADMISSION_CLIENT_BURST", 200))
+    ADMISSION_CLIENT_LIMITS: str = os.getenv("ADMISSION_CLIENT_LIMITS", "")  # client:max_in_flight:rate:burst, comma separated
+    ADMISSION_GLOBAL_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_GLOBAL_INITIAL_LIMIT", 64))  # concurrent requests per worker
+    ADMISSION_GLOBAL_MIN_LIMIT: int = int(os.getenv("ADMISSION_GLOBAL_MIN_LIMIT", 4))
+    ADMISSION_GLOBAL_MAX_LIMIT: int = int(os.getenv("ADMISSION_GLOBAL_MAX_LIMIT", 256))
+    ADMISSION_TARGET_LATENCY_MS: float = float(os.getenv("ADMISSION_TARGET_LATENCY_MS", 500))  # slower requests shrink the limit
+    ADMISSION_BACKOFF_RATIO: float = float(os.getenv("ADMISSION_BACKOFF_RATIO", 0.9))
+
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    BCRYPT_CALIBRATE_ON_STARTUP: bool = os.getenv("BCRYPT_CALIBRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+    BCRYPT_TARGET_VERIFY_MS: float = float(os.getenv("BCRYPT_TARGET_VERIFY_MS", 250))
+    BCRYPT_MIN_ROUNDS: int = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))  # calibration never goes below this
+    BCRYPT_MAX_ROUNDS: int = int(os.getenv("BCRYPT_MAX_ROUNDS", 16))
+
+    # Logging settings
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # json | text
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_SUCCESS_SAMPLE_RATE: float = float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", 1.0))  # share of successful requests logged
+    LOG_SLOW_REQUEST_MS: float = float(os.getenv("LOG_SLOW_REQUEST_MS", 1000))  # slower requests are always logged
+
+    # Tracing settings (spans are only recorded for sampled requests)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes")
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", 0.1))  # share of requests without a sampled parent traced
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "fastapi-app")
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "otlp")  # otlp | file
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "traces.jsonl")
+    TRACING_EXPORT_INTERVAL_SECONDS: float = float(os.getenv("TRACING_EXPORT_INTERVAL_SECONDS", 5))
+    TRACING_EXPORT_BATCH_SIZE: int = int(os.getenv("TRACING_EXPORT_BATCH_SIZE", 512))
+    TRACING_MAX_QUEUE_SIZE: int = int(os.getenv("TRACING_MAX_QUEUE_SIZE", 8192))  # finished spans beyond this are dropped
+
+    # Profiling settings (profiling is disabled while no token is set)
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", 1))
+    PROFILING_OUTPUT_DIR: str = os.getenv("PROFILING_OUTPUT_DIR", "profiles")
+
+    # Share identical concurrent repository reads between requests
+    SINGLEFLIGHT_ENABLED: bool = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # User cache settings
+    USER_CACHE_BACKEND: str = os.getenv("USER_CACHE_BACKEND", "memory")  # memory | none
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+    USER_CACHE_NEGATIVE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_NEGATIVE_TTL_SECONDS", 5))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))
+
+    # Evict cached users changed by other workers (Postgres LISTEN/NOTIFY)
+    CACHE_INVALIDATION_ENABLED: bool = os.getenv("CACHE_INVALIDATION_ENABLED", "true").lower() in ("1", "true", "yes")
+    CACHE_INVALIDATION_KEEPALIVE_SECONDS: float = float(os.getenv("CACHE_INVALIDATION_KEEPALIVE_SECONDS", 15))
+    CACHE_INVALIDATION_RECONNECT_SECONDS: float = float(os.getenv("CACHE_INVALIDATION_RECONNECT_SECONDS", 1))
+    CACHE_INVALIDATION_MAX_RECONNECT_SECONDS: float = float(os.getenv("CACHE_INVALIDATION_MAX_RECONNECT_SECONDS", 30))
+
+    # Per-worker in-memory copy of the users table serving lookups and lists
+    USER_REPLICA_ENABLED: bool = os.getenv("USER_REPLICA_ENABLED", "false").lower() in ("1", "true", "yes")
+    USER_REPLICA_POLL_SECONDS: float = float(os.getenv("USER_REPLICA_POLL_SECONDS", 1))
+    USER_REPLICA_MAX_STALENESS_SECONDS: float = float(os.getenv("USER_REPLICA_MAX_STALENESS_SECONDS", 5))  # older data falls back to the database
+    USER_REPLICA_FULL_RELOAD_SECONDS: float = float(os.getenv("USER_REPLICA_FULL_RELOAD_SECONDS", 300))
+    USER_REPLICA_LOAD_BATCH_SIZE: int = int(os.getenv("USER_REPLICA_LOAD_BATCH_SIZE", 5000))
+
+    # Per-worker Bloom filter of registered emails answering lookups of unknown emails,
+    # only while the invalidation listener (CACHE_INVALIDATION_ENABLED) reports new users
+    EMAIL_FILTER_ENABLED: bool = os.getenv("EMAIL_FILTER_ENABLED", "false").lower() in ("1", "true", "yes")
+    EMAIL_FILTER_FALSE_POSITIVE_RATE: float = float(os.getenv("EMAIL_FILTER_FALSE_POSITIVE_RATE", 0.01))
+    EMAIL_FILTER_SYNC_SECONDS: float = float(os.getenv("EMAIL_FILTER_SYNC_SECONDS", 1))
+    EMAIL_FILTER_MAX_STALENESS_SECONDS: float = float(os.getenv("EMAIL_FILTER_MAX_STALENESS_SECONDS", 5))  # older filters let every lookup through
+    EMAIL_FILTER_REBUILD_SECONDS: float = float(os.getenv("EMAIL_FILTER_REBUILD_SECONDS", 3600))
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -0,0 +1,74 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from app.exceptions.http_exceptions import GatewayTimeoutError
+
+class Deadline:
+    """
+    Point in time by which a request has to be answered.
+
+    One instance per request, shared by everything running in its context;
+    it is mutable so a router can override the default after the middleware
+    created it, and so finishing the response clears it for background tasks.
+    """
+    __slots__ = ("started", "expires_at")
+
+    def __init__(self, timeout: float):
+        self.started = time.monotonic()
+        self.expires_at: Optional[float] = self.started + timeout
+
+    def set_timeout(self, timeout: float) -> None:
+        """Replace the timeout, counted from the start of the request"""
+        if self.expires_at is not None:
+            self.expires_at = self.started + timeout
+
+    def clear(self) -> None:
+        """Lift the deadline, e.g. once the response was sent"""
+        self.expires_at = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, None without a deadline"""
+        return None if self.expires_at is None else self.expires_at - time.monotonic()
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+def start_deadline(timeout: float) -> Deadline:
+    """
+    Start the deadline of the request running in the current context.
+
+    Args:
+        timeout: Seconds the request may take
+
+    Returns:
+        The new deadline
+    """
+    deadline = Deadline(timeout)
+    _current.set(deadline)
+    return deadline
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+def remaining_time() -> Optional[float]:
+    """Seconds left until the current request's deadline, None outside requests"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+def check_deadline(minimum: float = 0.0) -> Optional[float]:
+    """
+    Fail fast when the remaining time can't cover the next step.
+
+    Args:
+        minimum: Seconds the next step needs at least
+
+    Returns:
+        Seconds left, None without a deadline
+
+    Raises:
+        GatewayTimeoutError: If less than minimum is left
+    """
+    remaining = remaining_time()
+    if remaining is not None and remaining <= minimum:
+        raise GatewayTimeoutError()
+    return remaining
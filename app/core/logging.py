@@ -0,0 +1,110 @@
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_dropped_records = metrics.counter("logging.dropped_records", "Log records lost because the queue was full")
+_listener: Optional[QueueListener] = None
+_listener_running = False
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the caller.
+
+    Records are dropped (and counted) when the queue is full instead of
+    waiting for the listener thread to catch up.
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped_records.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # only resolve what can't cross threads; formatting happens on the listener thread
+        message = record.getMessage()
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = message
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, merging structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Plain text format with structured fields appended as key=value pairs"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+def setup_logging() -> None:
+    """
+    Configure the root logger to hand records off to a background thread.
+
+    Application code logs into a bounded queue; a QueueListener thread formats
+    and writes them, so logging never blocks the event loop.
+    """
+    global _listener
+
+    if settings.LOG_FORMAT == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = TextFormatter(TEXT_FORMAT)
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+
+    stop_logging()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    start_logging()
+
+def start_logging() -> None:
+    """Start the listener thread writing queued records"""
+    global _listener_running
+    if _listener is not None and not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+def stop_logging() -> None:
+    """Stop the listener thread after writing the records already queued"""
+    global _listener_running
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
@@ -0,0 +1,203 @@
+import asyncio
+import collections
+import contextvars
+import json
+import os
+import sys
+import threading
+import weakref
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+_active_profiler: contextvars.ContextVar[Optional["RequestProfiler"]] = contextvars.ContextVar(
+    "active_profiler", default=None
+)
+_factory_lock = threading.Lock()
+_factory_users = 0
+_previous_factory: Any = None
+
+def _task_factory(loop, coro, **kwargs):
+    # runs in the creating task's context, so children of a profiled request are tracked
+    if _previous_factory is not None:
+        task = _previous_factory(loop, coro, **kwargs)
+    else:
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.tasks.add(task)
+    return task
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    global _factory_users, _previous_factory
+    with _factory_lock:
+        if _factory_users == 0:
+            _previous_factory = loop.get_task_factory()
+            loop.set_task_factory(_task_factory)
+        _factory_users += 1
+
+def _uninstall_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    global _factory_users, _previous_factory
+    with _factory_lock:
+        _factory_users -= 1
+        if _factory_users == 0:
+            loop.set_task_factory(_previous_factory)
+            _previous_factory = None
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    cwd = os.getcwd()
+    if filename.startswith(cwd):
+        filename = os.path.relpath(filename, cwd)
+    else:
+        filename = os.path.join(*filename.split(os.sep)[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames in the collapsed format
+    return f"{name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+def _thread_stack(frame: Optional[FrameType]) -> List[str]:
+    stack = []
+    while frame is not None:
+        # everything below the event loop's Handle._run is loop machinery
+        if frame.f_code.co_name == "_run" and frame.f_code.co_filename.endswith(os.path.join("asyncio", "events.py")):
+            break
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+def _coroutine_stack(coro: Any) -> List[str]:
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return stack
+
+class RequestProfiler:
+    """
+    Wall-clock sampling profiler scoped to one request.
+
+    A background thread samples every task spawned on behalf of the request.
+    The task running on the event loop contributes its live Python stack;
+    suspended tasks contribute their coroutine await chain, ending in an
+    "[await]" frame, so time spent waiting on the database shows up as well.
+    Samples are weighted by the sampling interval.
+    """
+
+    def __init__(self, name: str, interval: float = 0.001):
+        """
+        Initialize the profiler.
+
+        Args:
+            name: Profile name, usually the request method and path
+            interval: Seconds between samples
+        """
+        self.name = name
+        self.interval = interval
+        self.tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.samples: "collections.Counter[Tuple[str, ...]]" = collections.Counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def start(self) -> None:
+        """Start sampling the current task and every task it spawns"""
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self.tasks.add(asyncio.current_task())
+        self._token = _active_profiler.set(self)
+        _install_task_factory(self._loop)
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        _uninstall_task_factory(self._loop)
+        _active_profiler.reset(self._token)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        running = asyncio.current_task(self._loop)
+        for task in list(self.tasks):
+            if task.done():
+                continue
+            root = task.get_name()
+            if task is running:
+                frame = sys._current_frames().get(self._thread_id)
+                stack = _thread_stack(frame)
+            else:
+                stack = _coroutine_stack(task.get_coro()) + ["[await]"]
+            self.samples[(root, *stack)] += 1
+
+    def collapsed(self) -> str:
+        """Render samples in the collapsed stack format used by flamegraph.pl"""
+        weight = self.interval * 1000
+        return "".join(
+            f"{';'.join(stack)} {round(count * weight)}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+    def speedscope(self) -> Dict[str, Any]:
+        """Render samples as a speedscope sampled profile"""
+        frames: List[Dict[str, str]] = []
+        index: Dict[str, int] = {}
+        samples = []
+        weights = []
+        weight = self.interval * 1000
+        for stack, count in self.samples.items():
+            ids = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({"name": label})
+                ids.append(index[label])
+            samples.append(ids)
+            weights.append(count * weight)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write(self, directory: str, report_id: str, format: str = "collapsed") -> str:
+        """
+        Write the report to a file.
+
+        Args:
+            directory: Output directory, created if missing
+            report_id: Report identifier used as file name
+            format: "collapsed" or "speedscope"
+
+        Returns:
+            Path of the written report
+        """
+        os.makedirs(directory, exist_ok=True)
+        if format == "speedscope":
+            path = os.path.join(directory, f"{report_id}.speedscope.json")
+            with open(path, "w") as f:
+                json.dump(self.speedscope(), f)
+        else:
+            path = os.path.join(directory, f"{report_id}.collapsed")
+            with open(path, "w") as f:
+                f.write(self.collapsed())
+        return path
@@ -1,13 +1,21 @@
+import asyncio
+import math
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.tracing import start_span
 from jose import JWTError, jwt
 
+# hashes below min_rounds are reported by needs_update and upgraded on login
 pwd_context = CryptContext(
     schemes=["bcrypt"], 
     deprecated="auto",
-    bcrypt__rounds=12,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
     bcrypt__ident="2b"
 )
 
@@ -20,16 +28,20 @@ def create_access_token(
     Create access JWT token - placeholder implementation
     """
     to_encode = data.copy()
+    issued_at = datetime.now(timezone.utc)
 
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = issued_at + expires_delta
     else:
-        # Default expiration time
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        # Default expiration time, short-lived when tokens are trusted without a lookup
+        expire = issued_at + timedelta(
+            minutes=settings.STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES if settings.AUTH_STATELESS
+            else settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
     to_encode.update({
+        # sub-second precision so a revocation never covers a token issued right after it
+        "iat": issued_at.timestamp(),
         "exp": expire,
         "aud": settings.JWT_AUDIENCE,
         "iss": settings.JWT_ISSUER
@@ -61,3 +73,124 @@ def get_password_hash(password: str) -> str:
     Hash a password for storing.
     """
     return pwd_context.hash(password)
+
+# bcrypt releases the GIL, so a thread pool hashes in parallel without blocking the event loop
+_hashing_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_hashing_pool() -> ThreadPoolExecutor:
+    global _hashing_pool
+    if _hashing_pool is None:
+        _hashing_pool = ThreadPoolExecutor(max_workers=settings.HASHING_POOL_SIZE, thread_name_prefix="hashing")
+    return _hashing_pool
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash on the hashing pool.
+    """
+    with start_span("bcrypt.verify"):
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_hashing_pool(), pwd_context.verify, plain_password, hashed_password
+        )
+
+# one hash of a random password per cost factor, made on first use
+_dummy_hashes: Dict[int, str] = {}
+
+def _verify_dummy_password(plain_password: str) -> bool:
+    rounds = get_password_cost()
+    if rounds not in _dummy_hashes:
+        _dummy_hashes[rounds] = pwd_context.hash(secrets.token_urlsafe(16))
+    pwd_context.verify(plain_password, _dummy_hashes[rounds])
+    return False
+
+async def verify_dummy_password_async(plain_password: str) -> bool:
+    """
+    Spend the time of a password check when there is no user to check against.
+
+    Keeps failed logins for unknown emails as slow as wrong passwords, so
+    response times don't tell which emails are registered. Always False.
+    """
+    with start_span("bcrypt.verify", {"dummy": True}):
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_hashing_pool(), _verify_dummy_password, plain_password
+        )
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password for storing on the hashing pool.
+    """
+    with start_span("bcrypt.hash"):
+        return await asyncio.get_running_loop().run_in_executor(_get_hashing_pool(), pwd_context.hash, password)
+
+def shutdown_hashing_pool() -> None:
+    """
+    Wait for running hashes and release the hashing threads.
+    """
+    global _hashing_pool
+    if _hashing_pool is not None:
+        _hashing_pool.shutdown(wait=True)
+        _hashing_pool = None
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with outdated settings (e.g. a lower cost).
+    """
+    return pwd_context.needs_update(hashed_password)
+
+def get_password_cost() -> int:
+    """
+    Get the bcrypt cost factor used for new hashes.
+    """
+    return pwd_context.handler("bcrypt").default_rounds
+
+def set_password_cost(rounds: int) -> None:
+    """
+    Use a new bcrypt cost factor for new hashes and upgrade anything below it.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+def measure_verify_ms(rounds: int, samples: int = 3) -> float:
+    """
+    Measure how long one bcrypt verification takes at a cost factor on this CPU.
+
+    Returns:
+        Fastest of the samples, in milliseconds
+    """
+    handler = pwd_context.handler("bcrypt").using(rounds=rounds)
+    secret = "calibration-Passw0rd"
+    hashed = handler.hash(secret)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.verify(secret, hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def calibrate_password_cost(
+    target_ms: float,
+    min_rounds: int = settings.BCRYPT_MIN_ROUNDS,
+    max_rounds: int = settings.BCRYPT_MAX_ROUNDS
+) -> int:
+    """
+    Pick the highest bcrypt cost whose verification fits the latency budget.
+
+    Each extra round doubles the work, so the cost is extrapolated from a
+    measurement at min_rounds and then confirmed.
+
+    Args:
+        target_ms: Verification latency budget in milliseconds
+        min_rounds: Lowest acceptable cost, returned even if it exceeds the budget
+        max_rounds: Highest cost considered
+
+    Returns:
+        Chosen cost factor
+    """
+    base_ms = measure_verify_ms(min_rounds)
+    rounds = min_rounds
+    if base_ms < target_ms:
+        rounds = min(max_rounds, min_rounds + int(math.log2(target_ms / base_ms)))
+
+    # extrapolation is optimistic on noisy machines; step down until it fits
+    while rounds > min_rounds and measure_verify_ms(rounds, samples=1) > target_ms:
+        rounds -= 1
+
+    return rounds
@@ -0,0 +1,374 @@
+import asyncio
+import collections
+import functools
+import inspect
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_CODE_ERROR = 2
+
+# version-traceid-parentid-flags, see https://www.w3.org/TR/trace-context/
+TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    """
+    One timed operation of a trace, in the OpenTelemetry data model.
+
+    Used as a context manager, the span becomes the parent of spans started
+    inside it and ends on exit, recording an escaping exception as an error.
+    """
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    is_recording = True
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64) or 1:016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        """Header value making this span the parent of a downstream call"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: Union[BaseException, str]) -> None:
+        """Mark the span as failed"""
+        self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        """Stop the clock and queue the span for export; later calls do nothing"""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            _queue_span(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        if exc is not None:
+            self.record_error(exc)
+        self.end()
+
+class _NoopSpan:
+    """Stands in for spans of requests that aren't traced; does nothing"""
+    __slots__ = ()
+
+    is_recording = False
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: Union[BaseException, str]) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+def parse_traceparent(value: str) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Tuple of (trace ID, parent span ID, sampled), None if invalid
+    """
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+def start_trace(name: str, traceparent: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Start the root span of a request, continuing the caller's trace if any.
+
+    Head sampling: a caller's sampling decision is followed, requests
+    without one are traced with probability TRACING_SAMPLE_RATE. Requests
+    that aren't traced get NOOP_SPAN, and no span below it is recorded.
+
+    Args:
+        name: Span name
+        traceparent: Incoming traceparent header
+        attributes: Initial span attributes
+
+    Returns:
+        Server span to use as a context manager, or NOOP_SPAN
+    """
+    parent = parse_traceparent(traceparent) if traceparent else None
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = None, None
+        sampled = random.random() < settings.TRACING_SAMPLE_RATE
+    if not sampled:
+        return NOOP_SPAN
+    return Span(name, trace_id or f"{random.getrandbits(128) or 1:032x}", parent_id, SPAN_KIND_SERVER, attributes)
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = SPAN_KIND_INTERNAL):
+    """
+    Start a child of the current span.
+
+    Outside a traced request this returns NOOP_SPAN right away, which is
+    all tracing costs while disabled or not sampled.
+
+    Args:
+        name: Span name
+        attributes: Initial span attributes
+        kind: OTLP span kind
+
+    Returns:
+        Span to use as a context manager or end() explicitly, or NOOP_SPAN
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+def current_trace_id() -> Optional[str]:
+    """Trace ID of the request running in the current context, None if it isn't traced"""
+    span = _current.get()
+    return span.trace_id if span is not None else None
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator recording a span around each call of a function.
+
+    Keeps the signature, so FastAPI dependencies can be decorated. With
+    tracing disabled the function is returned as is.
+
+    Args:
+        name: Span name
+    """
+    def decorate(fn: Callable) -> Callable:
+        if not settings.TRACING_ENABLED:
+            return fn
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with start_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+class SpanExporter:
+    """
+    Base class for span exporters.
+
+    Exporters receive batches of finished spans as OTLP/JSON export
+    requests (ExportTraceServiceRequest).
+    """
+
+    async def export(self, request: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+class OTLPHttpExporter(SpanExporter):
+    """Sends spans to an OTLP/HTTP endpoint (e.g. an OpenTelemetry collector) as JSON"""
+
+    def __init__(self, endpoint: str, timeout: float = 10.0):
+        self.endpoint = endpoint
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, request: Dict[str, Any]) -> None:
+        response = await self._client.post(self.endpoint, json=request)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+class FileSpanExporter(SpanExporter):
+    """Appends one export request per line to a file, like the collector's file exporter"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, line: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def export(self, request: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._write, json.dumps(request, separators=(",", ":")) + "\n")
+
+EXPORTERS: Dict[str, Callable[[], SpanExporter]] = {
+    "otlp": lambda: OTLPHttpExporter(settings.TRACING_OTLP_ENDPOINT),
+    "file": lambda: FileSpanExporter(settings.TRACING_FILE_PATH),
+}
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64-bit integers are strings in OTLP/JSON
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+def encode_spans(spans: List[Span]) -> Dict[str, Any]:
+    """
+    Build the OTLP/JSON export request for finished spans.
+
+    Args:
+        spans: Finished spans
+
+    Returns:
+        ExportTraceServiceRequest as a JSON-serializable dictionary
+    """
+    encoded = []
+    for span in spans:
+        item = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        if span.error:
+            item["status"] = {"code": STATUS_CODE_ERROR, "message": span.error}
+        encoded.append(item)
+
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": settings.TRACING_SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "app"}, "spans": encoded}],
+    }]}
+
+# finished spans waiting for export; appended from request tasks and threadpool threads
+_finished: Deque[Span] = collections.deque()
+_dropped = metrics.counter("tracing.dropped_spans", "Finished spans dropped because the export queue was full")
+_exported = metrics.counter("tracing.exported_spans", "Spans handed to the exporter")
+_export_failures = metrics.counter("tracing.export_failures", "Failed span exports")
+
+_exporter: Optional[SpanExporter] = None
+_export_task: Optional[asyncio.Task] = None
+
+def _queue_span(span: Span) -> None:
+    if len(_finished) >= settings.TRACING_MAX_QUEUE_SIZE:
+        _dropped.inc()
+        return
+    _finished.append(span)
+
+def configure_exporter(exporter: Optional[SpanExporter]) -> None:
+    """
+    Install the exporter finished spans are sent to.
+
+    Call before start_tracing to use a custom exporter instead of the one
+    selected by TRACING_EXPORTER.
+
+    Args:
+        exporter: Span exporter
+    """
+    global _exporter
+    _exporter = exporter
+
+async def flush_spans() -> None:
+    """Export the queued spans in batches; a failed batch is dropped"""
+    while _finished and _exporter is not None:
+        batch = [_finished.popleft() for _ in range(min(len(_finished), settings.TRACING_EXPORT_BATCH_SIZE))]
+        try:
+            await _exporter.export(encode_spans(batch))
+        except Exception as e:
+            _export_failures.inc()
+            logger.error("Span export failed", extra={"fields": {"spans": len(batch), "error": repr(e)}})
+            return
+        _exported.inc(len(batch))
+
+async def _export_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.TRACING_EXPORT_INTERVAL_SECONDS)
+        await flush_spans()
+
+async def start_tracing() -> None:
+    """Start exporting spans in the background when tracing is enabled"""
+    global _export_task
+    if not settings.TRACING_ENABLED or _export_task is not None:
+        return
+    if _exporter is None:
+        factory = EXPORTERS.get(settings.TRACING_EXPORTER)
+        if factory is None:
+            raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
+        configure_exporter(factory())
+    _export_task = asyncio.create_task(_export_loop(), name="span-export")
+
+async def stop_tracing() -> None:
+    """Stop the background export, export what is left and close the exporter"""
+    global _export_task
+    if _export_task is None:
+        return
+    _export_task.cancel()
+    try:
+        await _export_task
+    except asyncio.CancelledError:
+        pass
+    _export_task = None
+    await flush_spans()
+    if _exporter is not None:
+        await _exporter.close()
+        configure_exporter(None)
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import get_password_hash_async, verify_password_async
+from app.db.session import engine
+from app.repositories.user import UserRepository
+from app.schemas.user import UserCreate, UserResponse
+from app.utils.response import create_response
+
+logger = logging.getLogger(__name__)
+
+async def warm_database(connections: int) -> None:
+    """
+    Open pool connections and run the hot statements on each of them.
+
+    asyncpg prepares statements and loads type codecs per connection, so the
+    connections are held open together to make the pool hand out distinct ones.
+
+    Args:
+        connections: Number of connections to open
+    """
+    async with AsyncExitStack() as stack:
+        conns = [await stack.enter_async_context(engine.connect()) for _ in range(connections)]
+
+        async def run(index: int, conn) -> None:
+            async with AsyncSession(bind=conn) as db:
+                repo = UserRepository(db)
+                # distinct parameters per connection so identical reads aren't shared
+                await repo.get(-(index + 1))
+                await repo.get_by_email(f"warmup-{index}@warmup.invalid")
+
+        await asyncio.gather(*(run(index, conn) for index, conn in enumerate(conns)))
+
+def warm_models(app: FastAPI) -> None:
+    """
+    Build the OpenAPI schema and exercise request/response models once.
+
+    Args:
+        app: FastAPI application instance
+    """
+    app.openapi()
+
+    UserCreate(email="warmup@example.com", password="Warmup123", first_name="Warm", last_name="Up")
+    now = datetime.utcnow()
+    user = UserResponse(id=0, email="warmup@example.com", first_name="Warm", last_name="Up", created_at=now, updated_at=now)
+    create_response(data=user)
+    create_response(data=[user])
+
+async def warm_hashing() -> None:
+    """Start the hashing threads and run one bcrypt verification"""
+    hashed = await get_password_hash_async("warmup")
+    await verify_password_async("warmup", hashed)
+
+async def warm_up(app: FastAPI) -> None:
+    """
+    Run the warm-up steps and mark the application ready.
+
+    A failing step is logged and skipped: warm-up only shifts work away from
+    the first requests, it must not keep the service from becoming ready.
+
+    Args:
+        app: FastAPI application instance
+    """
+    connections = settings.WARMUP_CONNECTIONS or settings.DB_POOL_SIZE
+    steps = [
+        ("database", lambda: warm_database(connections)),
+        ("models", lambda: asyncio.to_thread(warm_models, app)),
+        ("hashing", warm_hashing),
+    ]
+
+    started = time.perf_counter()
+    for name, step in steps:
+        step_started = time.perf_counter()
+        try:
+            await asyncio.wait_for(step(), timeout=settings.WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning("Warm-up step failed", extra={"fields": {"step": name, "error": repr(e)}})
+            continue
+        logger.info(
+            "Warm-up step finished",
+            extra={"fields": {"step": name, "duration_ms": round((time.perf_counter() - step_started) * 1000, 3)}},
+        )
+
+    app.state.ready = True
+    logger.info("Warm-up finished", extra={"fields": {"duration_ms": round((time.perf_counter() - started) * 1000, 3)}})
@@ -1,3 +1,8 @@
 # Import all models for Alembic to detect
 from app.db.base_class import Base
-from app.models.user import User
\ No newline at end of file
+from app.models.user import User
+from app.models.revocation import UserRevocation
+from app.models.user_archive import UserArchive
+from app.models.job import Job
+from app.models.idempotency import IdempotencyKey
+from app.models.user_email import UserEmail
\ No newline at end of file
@@ -1,12 +1,18 @@
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.deadline import check_deadline
+from app.core.tracing import SPAN_KIND_CLIENT, start_span
 
 # Create a standard synchronous engine with psycopg2
 engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URI,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     echo=False,
 )
 
@@ -18,7 +24,55 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession
 )
 
+# constant text so asyncpg prepares it once per connection, whatever the timeout
+SET_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+@event.listens_for(Session, "after_begin")
+def apply_request_deadline(session, transaction, connection) -> None:
+    """
+    Bound every transaction started for a request by the time it has left.
+
+    Runs once the connection was checked out, so time spent waiting for the
+    pool counts: a transaction is refused when less than DB_MIN_REMAINING_MS
+    is left, otherwise the remainder becomes the transaction's
+    statement_timeout (SET LOCAL, reset at commit or rollback).
+    """
+    remaining = check_deadline(settings.DB_MIN_REMAINING_MS / 1000)
+    if remaining is not None and connection.dialect.name == "postgresql":
+        connection.execute(SET_STATEMENT_TIMEOUT, {"timeout": f"{int(remaining * 1000)}ms"})
+
+# long statements (bulk inserts) are cut in span attributes
+MAX_TRACED_STATEMENT_LENGTH = 2048
+
+if settings.TRACING_ENABLED:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_statement_span(conn, cursor, statement, parameters, context, executemany) -> None:
+        """Record a span for every statement sent by a traced request; parameters are left out"""
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "QUERY"
+        span = start_span(operation, kind=SPAN_KIND_CLIENT, attributes={
+            "db.system.name": conn.dialect.name,
+            "db.operation.name": operation,
+            "db.query.text": statement[:MAX_TRACED_STATEMENT_LENGTH],
+        })
+        if span.is_recording:
+            context._trace_span = span
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def end_statement_span(conn, cursor, statement, parameters, context, executemany) -> None:
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def fail_statement_span(exception_context) -> None:
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_error(exception_context.original_exception)
+            span.end()
+
 async def get_db():
+    # fail fast instead of queueing for a connection the request can't use anymore
+    check_deadline(settings.DB_MIN_REMAINING_MS / 1000)
     async with AsyncSessionLocal() as session:
         try:
             yield session
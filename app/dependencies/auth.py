@@ -4,19 +4,67 @@ from fastapi.security import OAuth2PasswordBearer
 
 from app.core.security import verify_token
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tracing import traced
 from app.dependencies.services import get_user_service
 from app.exceptions.http_exceptions import BadRequestError, UnauthorizedError
-from app.schemas.user import UserResponse
+from app.schemas.user import UserPrincipal, UserResponse
+from app.services.revocation_service import revocation_list
 from app.services.user_service import UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+_stateless_auth = metrics.counter("auth.stateless", "Requests authenticated from token claims alone")
+_lookup_auth = metrics.counter("auth.db_lookup", "Requests authenticated with a user lookup")
+
+def principal_from_claims(payload: dict) -> Optional[UserPrincipal]:
+    """
+    Build the principal from token claims when stateless auth can be trusted.
+
+    Claims are only trusted for short-lived tokens carrying the principal
+    claims, and while the revocation list is fresh; otherwise None is
+    returned and the caller falls back to a user lookup.
+    """
+    if not settings.AUTH_STATELESS or not revocation_list.is_fresh:
+        return None
+
+    try:
+        user_id = int(payload["sub"])
+        issued_at = float(payload["iat"])
+        lifetime = float(payload["exp"]) - issued_at
+        principal = UserPrincipal.model_construct(
+            id=user_id,
+            email=payload["email"],
+            role=payload.get("role"),
+            is_active=bool(payload["act"]),
+            first_name=payload.get("first_name"),
+            last_name=payload.get("last_name"),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    # long-lived tokens predate stateless mode; revocations are not kept that long
+    if lifetime > settings.STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 1:
+        return None
+
+    if revocation_list.is_revoked(user_id, issued_at):
+        raise UnauthorizedError(
+            error_code="INVALID_CREDENTIALS",
+            detail="Could not validate credentials"
+        )
+
+    return principal
+
+@traced("dependency get_current_user")
 async def get_current_user(
     token: str = Depends(oauth2_scheme),    
     user_service: UserService = Depends(get_user_service)
 ):
     """
     Get the current authenticated user from the token.    
+
+    In stateless auth mode this is a UserPrincipal built from the token
+    claims, without a database query.
     
     Args:
         token: JWT access token
@@ -35,6 +83,12 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
 
+    principal = principal_from_claims(payload)
+    if principal is not None:
+        _stateless_auth.inc()
+        return principal
+
+    _lookup_auth.inc()
     user = await user_service.get_by_email(payload.get("email"))
     if user is None:
         raise UnauthorizedError(
@@ -45,6 +99,7 @@ async def get_current_user(
     return user
 
 
+@traced("dependency get_current_active_user")
 async def get_current_active_user(current_user: UserResponse = Depends(get_current_user)):
     """
     Get the current active user from the token.
@@ -93,6 +148,7 @@ def authorize(allowed_roles: Optional[List[str]] = None):
     Dependency for role-based access control.
     If no roles are provided, any authenticated active user is allowed.
     """
+    @traced("dependency authorize")
     async def role_checker(current_user: UserResponse = Depends(get_current_active_user)):
         if allowed_roles:
             user_role = current_user.role
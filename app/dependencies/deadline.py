@@ -0,0 +1,15 @@
+from app.core.deadline import current_deadline
+
+def request_deadline(timeout_ms: float):
+    """
+    Dependency overriding the request deadline, for a router or a route.
+
+    The timeout counts from the start of the request, like the default
+    REQUEST_DEADLINE_MS it replaces.
+    """
+    async def set_deadline() -> None:
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.set_timeout(timeout_ms / 1000)
+
+    return set_deadline
@@ -0,0 +1,32 @@
+from typing import Optional, Sequence, Tuple
+from fastapi import Query
+
+from app.exceptions.http_exceptions import BadRequestError
+
+def sparse_fields(allowed_fields: Sequence[str]):
+    """
+    Dependency parsing a ?fields= projection.
+    Returns the requested fields in the order of allowed_fields, or None when
+    the parameter is absent and the full representation should be returned.
+    """
+    def parse_fields(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma separated fields to return, any of: {', '.join(allowed_fields)}"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested.difference(allowed_fields)
+        if not requested or unknown:
+            raise BadRequestError(
+                error_code="INVALID_FIELDS",
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested"
+            )
+
+        # a canonical order keeps one cached statement per field set
+        return tuple(field for field in allowed_fields if field in requested)
+
+    return parse_fields
@@ -2,10 +2,26 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import get_user_cache
+from app.core.tracing import traced
 from app.db.session import get_db
+from app.repositories.idempotency import IdempotencyRepository
+from app.repositories.job import JobRepository
+from app.repositories.revocation import RevocationRepository
 from app.repositories.user import UserRepository
 from app.services.user_service import UserService
 
 
+@traced("dependency get_user_service")
 def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
-    return UserService(db, UserRepository(db))
\ No newline at end of file
+    return UserService(
+        db,
+        UserRepository(db),
+        cache=get_user_cache(),
+        revocation_repo=RevocationRepository(db),
+        job_repo=JobRepository(db)
+    )
+
+
+def get_idempotency_repository(db: AsyncSession = Depends(get_db)) -> IdempotencyRepository:
+    return IdempotencyRepository(db)
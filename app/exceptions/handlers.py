@@ -1,7 +1,8 @@
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
-from app.exceptions.http_exceptions import BaseCustomError
+from sqlalchemy.exc import DBAPIError
+from app.exceptions.http_exceptions import BaseCustomError, GatewayTimeoutError
 from app.utils.response import create_response
 from fastapi import status
 from starlette.exceptions import HTTPException as StarletteHTTPException  # Import Starlette's HTTPException
@@ -66,6 +67,14 @@ def add_exception_handlers(app: FastAPI) -> None:
                 
         return response
         
+    @app.exception_handler(DBAPIError)
+    async def database_exception_handler(request: Request, exc: DBAPIError):
+        """Handle database errors; statements cancelled by statement_timeout ran out of the request deadline"""
+        # 57014: query_canceled
+        if getattr(exc.orig, "sqlstate", None) == "57014":
+            return await custom_exception_handler(request, GatewayTimeoutError())
+        return await unhandled_exception_handler(request, exc)
+
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
         """Handle unhandled exceptions"""
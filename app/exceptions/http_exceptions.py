@@ -37,4 +37,15 @@ class BadRequestError(BaseCustomError):
 class ServerError(BaseCustomError):
     """Exception raised for server errors"""
     def __init__(self, detail: str = "Internal server error", error_code: str = "SERVER_ERROR"):
-        super().__init__(detail=detail, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, error_code=error_code)
\ No newline at end of file
+        super().__init__(detail=detail, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, error_code=error_code)
+
+class ServiceUnavailableError(BaseCustomError):
+    """Exception raised when the service can't take requests right now"""
+    def __init__(self, detail: str = "Service unavailable", headers: dict = None, error_code: str = "SERVICE_UNAVAILABLE"):
+        self.headers = headers or {}
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE, error_code=error_code)
+
+class GatewayTimeoutError(BaseCustomError):
+    """Exception raised when a request ran out of its deadline"""
+    def __init__(self, detail: str = "Request deadline exceeded", error_code: str = "DEADLINE_EXCEEDED"):
+        super().__init__(detail=detail, status_code=status.HTTP_504_GATEWAY_TIMEOUT, error_code=error_code)
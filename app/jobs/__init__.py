@@ -0,0 +1,5 @@
+# Jobs package
+# Deferred work stored in the jobs table and executed by the in-process runner.
+# Handlers register with @job_handler("type"); enqueue with JobRepository.enqueue
+# or UserService.enqueue_job to make the job part of the caller's transaction.
+from app.jobs.runner import get_job_type, job_handler, start_job_runner, stop_job_runner
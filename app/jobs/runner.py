@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.repositories.job import ClaimedJob, JobRepository
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL_SECONDS = 30
+LAG_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+class JobType(NamedTuple):
+    name: str
+    handler: Callable[[Dict[str, Any]], Awaitable[None]]
+    concurrency: int
+    max_attempts: int
+
+_job_types: Dict[str, JobType] = {}
+
+def job_handler(name: str, *, concurrency: int = 1, max_attempts: int = 5):
+    """
+    Register a coroutine function as the handler of a job type.
+
+    Args:
+        name: Job type
+        concurrency: Maximum jobs of this type running at once in a worker process
+        max_attempts: Default attempts for jobs of this type
+    """
+    def decorator(fn: Callable[[Dict[str, Any]], Awaitable[None]]):
+        _job_types[name] = JobType(name, fn, concurrency, max_attempts)
+        return fn
+
+    return decorator
+
+def get_job_type(name: str) -> Optional[JobType]:
+    """Get a registered job type"""
+    return _job_types.get(name)
+
+def backoff(attempts: int) -> timedelta:
+    """Exponential backoff with jitter after the given number of failed attempts"""
+    delay = min(settings.JOB_BACKOFF_MAX_SECONDS, settings.JOB_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+_lag = metrics.histogram("jobs.lag_seconds", "Time between a job becoming due and being claimed", LAG_BUCKETS)
+
+class JobRunner:
+    """
+    Polls the jobs table and runs claimed jobs as tasks on the event loop.
+
+    Each worker process runs its own runner; SKIP LOCKED claims keep them
+    from taking the same job. Per-type concurrency limits apply per process.
+    """
+
+    def __init__(self):
+        self._running: Dict[str, Set[asyncio.Task]] = defaultdict(set)
+        self._maintained_at = 0.0
+        metrics.register_collector(
+            "jobs.running",
+            lambda: {f"jobs.{name}.running": len(tasks) for name, tasks in self._running.items()},
+        )
+
+    async def run(self) -> None:
+        """Claim and start jobs until cancelled"""
+        while True:
+            try:
+                if time.monotonic() - self._maintained_at > MAINTENANCE_INTERVAL_SECONDS:
+                    await self.maintain()
+                claimed = await self.poll()
+            except Exception as e:
+                logger.error("Job polling failed", extra={"fields": {"error": str(e)}})
+                claimed = 0
+            if not claimed:
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_MS / 1000)
+
+    async def poll(self) -> int:
+        """
+        Claim due jobs for every type with free slots and start them.
+
+        Returns:
+            Number of jobs started
+        """
+        started = 0
+        async with AsyncSessionLocal() as db:
+            repo = JobRepository(db)
+            for job_type in list(_job_types.values()):
+                free = job_type.concurrency - len(self._running[job_type.name])
+                if free <= 0:
+                    continue
+                for job in await repo.claim(job_type.name, free):
+                    _lag.observe(max(job.lag_seconds, 0.0))
+                    task = asyncio.create_task(self._execute(job_type, job), name=f"job-{job.id}")
+                    self._running[job_type.name].add(task)
+                    task.add_done_callback(self._running[job_type.name].discard)
+                    started += 1
+        return started
+
+    async def maintain(self) -> None:
+        """Requeue abandoned jobs and refresh queue depth gauges"""
+        async with AsyncSessionLocal() as db:
+            repo = JobRepository(db)
+            requeued = await repo.requeue_stale(timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS))
+            queued = await repo.count_queued()
+        if requeued:
+            logger.warning("Requeued abandoned jobs", extra={"fields": {"jobs": requeued}})
+        for name in set(queued) | set(_job_types):
+            metrics.gauge(f"jobs.{name}.queued", "Jobs waiting to run").set(queued.get(name, 0))
+        self._maintained_at = time.monotonic()
+
+    async def _record(self, action: Callable[[JobRepository], Awaitable[None]]) -> None:
+        async with AsyncSessionLocal() as db:
+            await action(JobRepository(db))
+
+    async def _execute(self, job_type: JobType, job: ClaimedJob) -> None:
+        started = time.perf_counter()
+        try:
+            await job_type.handler(job.payload)
+        except asyncio.CancelledError:
+            # interrupted by shutdown: hand the job to the next runner
+            await asyncio.shield(self._record(lambda repo: repo.release(job.id)))
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts >= job.max_attempts:
+                await self._record(lambda repo: repo.fail(job.id, error))
+                metrics.counter(f"jobs.{job_type.name}.failed", "Jobs failed for good").inc()
+                logger.error("Job failed", extra={"fields": {"job_id": job.id, "type": job_type.name, "attempts": job.attempts, "error": error}})
+            else:
+                await self._record(lambda repo: repo.retry(job.id, error, backoff(job.attempts)))
+                metrics.counter(f"jobs.{job_type.name}.retried", "Job attempts that failed and were rescheduled").inc()
+                logger.warning("Job attempt failed", extra={"fields": {"job_id": job.id, "type": job_type.name, "attempts": job.attempts, "error": error}})
+        else:
+            await self._record(lambda repo: repo.complete(job.id))
+            metrics.counter(f"jobs.{job_type.name}.succeeded", "Jobs completed").inc()
+        finally:
+            metrics.histogram(f"jobs.{job_type.name}.duration_seconds", "Job handler run time").observe(time.perf_counter() - started)
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Wait for running jobs, then cancel (and requeue) what is left.
+
+        Args:
+            timeout: Seconds to wait before cancelling
+        """
+        tasks = [task for running in self._running.values() for task in running]
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+job_runner = JobRunner()
+
+_runner_task: Optional[asyncio.Task] = None
+
+async def start_job_runner() -> None:
+    """Start running jobs in the background"""
+    global _runner_task
+    if settings.JOBS_ENABLED and _runner_task is None:
+        _runner_task = asyncio.create_task(job_runner.run(), name="job-runner")
+
+async def stop_job_runner() -> None:
+    """Stop claiming jobs and let running ones finish"""
+    global _runner_task
+    if _runner_task is not None:
+        _runner_task.cancel()
+        try:
+            await _runner_task
+        except asyncio.CancelledError:
+            pass
+        _runner_task = None
+        await job_runner.drain(settings.JOB_SHUTDOWN_TIMEOUT_SECONDS)
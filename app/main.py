@@ -1,11 +1,25 @@
 from fastapi import FastAPI
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.logging import setup_logging, start_logging, stop_logging
+from app.core.warmup import warm_up
+from app.core.security import calibrate_password_cost, set_password_cost, shutdown_hashing_pool
+from app.core.tracing import start_tracing, stop_tracing
+from app.db.session import engine
+from app.jobs import start_job_runner, stop_job_runner
+from app.services.cache_invalidation import start_cache_invalidation, stop_cache_invalidation
+from app.services.email_filter import start_email_filter, stop_email_filter
+from app.services.login_activity import start_login_activity, stop_login_activity
+from app.services.archival_service import start_user_archival, stop_user_archival
+from app.services.revocation_service import start_revocation_sync, stop_revocation_sync
+from app.services.user_replica import start_user_replica, stop_user_replica
 from app.api.v1.api import api_router
 from app.exceptions.handlers import add_exception_handlers
 from app.middlewares.setup import setup_middlewares
@@ -13,10 +27,7 @@ from app.utils.docs import setup_swagger_documentation
 from app.utils.response import create_response
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -31,12 +42,46 @@ async def lifespan(app: FastAPI):
         app: FastAPI application instance
     """
     # Perform startup tasks here
+    start_logging()
+    await start_tracing()
     logger.info("Starting up the application...")
+
+    if settings.BCRYPT_CALIBRATE_ON_STARTUP:
+        rounds = await run_in_threadpool(calibrate_password_cost, settings.BCRYPT_TARGET_VERIFY_MS)
+        set_password_cost(rounds)
+        logger.info("Calibrated bcrypt cost", extra={"fields": {"rounds": rounds}})
+
+    await start_cache_invalidation()
+    await start_revocation_sync()
+    await start_user_archival()
+    await start_job_runner()
+    await start_login_activity()
+    await start_user_replica()
+    await start_email_filter()
+
+    # readiness stays false until warm-up finished; liveness is served meanwhile
+    app.state.ready = not settings.WARMUP_ENABLED
+    warmup_task = asyncio.create_task(warm_up(app), name="warm-up") if settings.WARMUP_ENABLED else None
     
     yield
     # Perform shutdown tasks here
     logger.info("Shutting down the application...")
     # Close database connections, etc.
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await stop_cache_invalidation()
+    await stop_revocation_sync()
+    await stop_user_archival()
+    await stop_job_runner()
+    await stop_login_activity()
+    await stop_user_replica()
+    await stop_email_filter()
+    shutdown_hashing_pool()
+    await engine.dispose()
+    await stop_tracing()
+
+    # flush queued log records last
+    stop_logging()
 
 # Create FastAPI app
 app = FastAPI(
@@ -0,0 +1,79 @@
+import time
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.admission import AdmissionController, admission
+from app.core.config import settings
+from app.utils.response import create_response
+
+# never shed: probes, docs, static files and the admission state itself
+EXEMPT_PATHS = ("/", "/favicon.ico", f"{settings.API_V1_STR}/admin/admission")
+EXEMPT_PREFIXES = (
+    f"{settings.API_V1_STR}/health",
+    f"{settings.API_V1_STR}/docs",
+    f"{settings.API_V1_STR}/redoc",
+    f"{settings.API_V1_STR}/openapi.json",
+    "/images",
+    "/css",
+    "/js",
+)
+
+class AdmissionMiddleware:
+    """
+    Middleware shedding requests over the admission limits.
+
+    Runs right after the client ID check and before everything else, so a
+    shed request costs a dictionary lookup and never reaches authentication,
+    the hashing pool or the database. Shed requests get 429 (client over its
+    own limits) or 503 (worker overloaded) with a Retry-After header.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+        self.client_ids = frozenset(settings.CLIENT_IDS.split(","))
+
+    def _client_id(self, scope: Scope):
+        for name, value in scope["headers"]:
+            if name == b"x-client-id":
+                client_id = value.decode("latin-1")
+                # unknown IDs (on paths without the client ID check) share the anonymous budget
+                return client_id if client_id in self.client_ids else None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        client_id = self._client_id(scope)
+        rejection = self.controller.admit(client_id)
+        if rejection is not None:
+            response = create_response(
+                success=False,
+                message="Too many requests" if rejection.status_code == 429 else "Service overloaded",
+                errors=["Request shed by admission control, retry later"],
+                error_code=rejection.reason,
+                status_code=rejection.status_code
+            )
+            response.headers["Retry-After"] = str(rejection.retry_after)
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(client_id, time.perf_counter() - started)
+
+def setup_admission_middleware(app: FastAPI) -> None:
+    """
+    Set up admission control for the application.
+
+    Args:
+        app: FastAPI application instance
+    """
+    if settings.ADMISSION_ENABLED:
+        app.add_middleware(AdmissionMiddleware)
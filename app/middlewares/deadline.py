@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.deadline import start_deadline
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_cancelled = metrics.counter("requests.cancelled_on_disconnect", "Requests cancelled because the client went away")
+
+class DeadlineMiddleware:
+    """
+    Middleware giving every request a deadline and cancelling abandoned ones.
+
+    The deadline (REQUEST_DEADLINE_MS, routers may override it) is picked up
+    by the database session, which passes the remaining time to Postgres as
+    statement_timeout and refuses to start a transaction without enough time
+    left.
+
+    The request is served in its own task while the connection is watched
+    for a disconnect. A client giving up before its response is complete
+    cancels the task, and asyncpg cancels the running query on the server.
+    Once the response is sent the deadline is lifted, so background tasks
+    run without it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = start_deadline(settings.REQUEST_DEADLINE_MS / 1000)
+        response_complete = False
+        disconnect: Optional[Message] = None
+        # holds one message: the request body is still read at the app's pace
+        messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+        async def receive_from_queue() -> Message:
+            # like the server, keep answering with the disconnect once it happened
+            if disconnect is not None and messages.empty():
+                return disconnect
+            return await messages.get()
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+                deadline.clear()
+            await send(message)
+
+        # created after start_deadline: the task's context carries the deadline
+        app_task = asyncio.create_task(self.app(scope, receive_from_queue, send_tracking))
+
+        async def watch_disconnect() -> None:
+            nonlocal disconnect
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnect = message
+                    if not response_complete:
+                        _cancelled.inc()
+                        app_task.cancel()
+                    # wake up an app waiting for the body
+                    if not messages.full():
+                        messages.put_nowait(message)
+                    return
+                await messages.put(message)
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            # the server cancelling us propagates; a request cancelled for a disconnect has nobody to answer
+            if asyncio.current_task().cancelling():
+                raise
+            logger.info(
+                "Request cancelled, client disconnected",
+                extra={"fields": {"method": scope["method"], "path": scope["path"]}},
+            )
+        finally:
+            watcher.cancel()
+            if not app_task.done():
+                app_task.cancel()
+
+def setup_deadline_middleware(app: FastAPI) -> None:
+    """
+    Set up request deadlines for the application.
+
+    Args:
+        app: FastAPI application instance
+    """
+    app.add_middleware(DeadlineMiddleware)
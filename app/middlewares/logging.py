@@ -1,66 +1,92 @@
+import random
 import time
-from typing import Callable
+import uuid
+from typing import Any, Callable, Dict
 import logging
 
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core.config import settings
+from app.core.tracing import current_trace_id
+
 logger = logging.getLogger(__name__)
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware for logging requests and responses"""
-    
+
+    def _fields(self, request: Request, request_id: str, status_code: int, duration: float) -> Dict[str, Any]:
+        # route template keeps cardinality low (/users/{id} rather than /users/42)
+        route = request.scope.get("route")
+        fields = {
+            "method": request.method,
+            "route": getattr(route, "path", request.url.path),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "client_id": request.headers.get("X-Client-ID"),
+            "request_id": request_id,
+        }
+        # ties the log line to the request's trace, when it is traced
+        trace_id = current_trace_id()
+        if trace_id is not None:
+            fields["trace_id"] = trace_id
+        return fields
+
+    def _should_log(self, status_code: int, duration: float) -> bool:
+        if status_code >= 400 or duration * 1000 >= settings.LOG_SLOW_REQUEST_MS:
+            return True
+        rate = settings.LOG_SUCCESS_SAMPLE_RATE
+        return rate >= 1 or random.random() < rate
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """
         Process the request, log timing and status code.
-        
+
+        Successful requests are sampled according to LOG_SUCCESS_SAMPLE_RATE;
+        errors and slow requests are always logged.
+
         Args:
             request: The incoming request
             call_next: The next middleware or route handler
-            
+
         Returns:
             The response from the next middleware or route
         """
-        start_time = time.time()
-        
-        # Get request details
-        method = request.method
-        url = str(request.url)
-        
-        # Log the request
-        logger.info(f"Request: {method} {url}")
-        
+        start_time = time.perf_counter()
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        request.state.request_id = request_id
+
         # Process the request
         try:
             response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log the response
-            logger.info(
-                f"Response: {method} {url} - Status: {response.status_code} - "
-                f"Completed in {process_time:.4f}s"
-            )
-            
-            # Add custom header with processing time
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
         except Exception as e:
             # Log any unhandled exceptions
-            process_time = time.time() - start_time
-            logger.error(
-                f"Error: {method} {url} - Error: {str(e)} - "
-                f"Terminated in {process_time:.4f}s"
-            )
+            process_time = time.perf_counter() - start_time
+            fields = self._fields(request, request_id, 500, process_time)
+            fields["error"] = str(e)
+            logger.error("Request failed", extra={"fields": fields})
             raise
 
+        # Calculate processing time
+        process_time = time.perf_counter() - start_time
+
+        if logger.isEnabledFor(logging.INFO) and self._should_log(response.status_code, process_time):
+            logger.info(
+                "Request completed",
+                extra={"fields": self._fields(request, request_id, response.status_code, process_time)}
+            )
+
+        # Add custom header with processing time
+        response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-Request-ID"] = request_id
+
+        return response
+
 def setup_logging_middleware(app: FastAPI) -> None:
     """
     Set up logging middleware for the application.
-    
+
     Args:
         app: FastAPI application instance
     """
-    app.add_middleware(LoggingMiddleware)
\ No newline at end of file
+    app.add_middleware(LoggingMiddleware)
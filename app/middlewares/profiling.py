@@ -0,0 +1,87 @@
+import hmac
+import logging
+import uuid
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.profiler import RequestProfiler
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+class ProfilingMiddleware:
+    """
+    Middleware profiling single requests on demand.
+
+    A request is profiled when it carries an X-Profile header (or a
+    __profile query parameter) together with an X-Profile-Token matching
+    PROFILING_TOKEN. The value selects the report format ("collapsed" or
+    "speedscope"). Reports are written to PROFILING_OUTPUT_DIR and their id is
+    returned in the X-Profile-Id response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _requested_format(self, scope: Scope):
+        requested = None
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                requested = value.decode("latin-1")
+            elif name == b"x-profile-token":
+                token = value.decode("latin-1")
+
+        if requested is None and b"__profile" in scope.get("query_string", b""):
+            query = parse_qs(scope["query_string"].decode("latin-1"))
+            requested = query.get("__profile", [None])[0]
+            token = token or query.get("__profile_token", [None])[0]
+
+        if requested is None or not token:
+            return None
+        if not hmac.compare_digest(token.encode(), settings.PROFILING_TOKEN.encode()):
+            return None
+        return requested if requested in PROFILE_FORMATS else "collapsed"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        format = self._requested_format(scope) if scope["type"] == "http" else None
+        if format is None:
+            await self.app(scope, receive, send)
+            return
+
+        report_id = uuid.uuid4().hex
+
+        async def send_with_report_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", report_id.encode())]
+            await send(message)
+
+        profiler = RequestProfiler(
+            name=f"{scope['method']} {scope['path']}",
+            interval=settings.PROFILING_INTERVAL_MS / 1000
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_report_id)
+        finally:
+            profiler.stop()
+            path = await run_in_threadpool(profiler.write, settings.PROFILING_OUTPUT_DIR, report_id, format)
+            logger.info("Request profile written", extra={"fields": {"profile_id": report_id, "path": path}})
+
+def setup_profiling_middleware(app: FastAPI) -> None:
+    """
+    Set up on-demand profiling for the application.
+
+    The middleware is only installed when PROFILING_TOKEN is configured, so
+    regular deployments don't pay for it.
+
+    Args:
+        app: FastAPI application instance
+    """
+    if settings.PROFILING_TOKEN:
+        app.add_middleware(ProfilingMiddleware)
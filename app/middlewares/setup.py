@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 
+from app.middlewares.admission import setup_admission_middleware
 from app.middlewares.cors import setup_cors_middleware
+from app.middlewares.deadline import setup_deadline_middleware
 from app.middlewares.logging import setup_logging_middleware
 from app.middlewares.clientid import setup_clientid_middleware
+from app.middlewares.profiling import setup_profiling_middleware
+from app.middlewares.tracing import setup_tracing_middleware, trace_middleware
 
 def setup_middlewares(app: FastAPI) -> None:
     """
@@ -13,9 +17,27 @@ def setup_middlewares(app: FastAPI) -> None:
     """
     # Set up CORS middleware
     setup_cors_middleware(app)
-    
+    trace_middleware(app, "cors")
+
     # Set up logging middleware
     setup_logging_middleware(app)
+    trace_middleware(app, "logging")
+
+    # Set up request deadlines for admitted requests
+    setup_deadline_middleware(app)
+    trace_middleware(app, "deadline")
+
+    # Set up admission control inside the client ID check, ahead of everything else
+    setup_admission_middleware(app)
+    trace_middleware(app, "admission")
 
     # Set up client ID middleware
-    setup_clientid_middleware(app)
\ No newline at end of file
+    setup_clientid_middleware(app)
+    trace_middleware(app, "clientid")
+
+    # Set up profiling middleware so it wraps every other middleware
+    setup_profiling_middleware(app)
+    trace_middleware(app, "profiling")
+
+    # Set up tracing last: the request's trace starts before any other middleware
+    setup_tracing_middleware(app)
@@ -0,0 +1,87 @@
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.tracing import start_span, start_trace
+
+class TracingMiddleware:
+    """
+    Middleware starting a trace for every request.
+
+    Continues the caller's trace when the request carries a traceparent
+    header and samples the rest (TRACING_SAMPLE_RATE). The server span is
+    named after the route template once routing is done, like the request
+    log.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        span = start_trace(method, traceparent, {"http.request.method": method, "url.path": scope["path"]})
+        if not span.is_recording:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_traced(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.record_error(f"HTTP {status}")
+            await send(message)
+
+        with span:
+            try:
+                await self.app(scope, receive, send_traced)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{method} {route.path}"
+                    span.set_attribute("http.route", route.path)
+
+class SpanMiddleware:
+    """Middleware recording a span around the middleware it wraps"""
+
+    def __init__(self, app: ASGIApp, name: str):
+        self.app = app
+        self.name = name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with start_span(self.name):
+            await self.app(scope, receive, send)
+
+def trace_middleware(app: FastAPI, name: str) -> None:
+    """
+    Record a span around the middleware added last, when tracing is enabled.
+
+    Args:
+        app: FastAPI application instance
+        name: Middleware name, used in the span name
+    """
+    if settings.TRACING_ENABLED:
+        app.add_middleware(SpanMiddleware, name=f"middleware {name}")
+
+def setup_tracing_middleware(app: FastAPI) -> None:
+    """
+    Set up request tracing for the application, when enabled.
+
+    Args:
+        app: FastAPI application instance
+    """
+    if settings.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import JSON, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response stored for a client-supplied Idempotency-Key.
+
+    A retried request with the same key gets the stored response back
+    instead of being executed again.
+    """
+    __tablename__ = "idempotency_keys"
+
+    scope: Mapped[str] = mapped_column(String(50), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64))  # HMAC of the request body
+    status_code: Mapped[int] = mapped_column(Integer)
+    response: Mapped[Dict[str, Any]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
@@ -0,0 +1,35 @@
+import enum
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base_class import Base
+
+
+class JobStatus(enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    FAILED = "FAILED"
+
+class Job(Base):
+    """
+    Deferred unit of work, executed by the in-process job runner.
+
+    Succeeded jobs are deleted; jobs out of attempts stay as FAILED.
+    """
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    type: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    status: Mapped[str] = mapped_column(String(20), default=JobStatus.QUEUED.value)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5)
+    run_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+# claim scans only runnable jobs, in due order
+Index("ix_jobs_queued_run_at", Job.type, Job.run_at, postgresql_where=Job.status == JobStatus.QUEUED.value)
+Index("ix_jobs_running_locked_at", Job.locked_at, postgresql_where=Job.status == JobStatus.RUNNING.value)
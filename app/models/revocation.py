@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base_class import Base
+
+
+class UserRevocation(Base):
+    """
+    Revocation marker for a user's access tokens.
+
+    Tokens issued at or before revoked_at are rejected in stateless auth mode.
+    There is deliberately no foreign key: revocations must outlive deleted users.
+    """
+    __tablename__ = "user_revocations"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func, Enum
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, func, Enum
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -16,17 +16,25 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    email: Mapped[str] = mapped_column(String(300), unique=True, index=True)
+    # uniqueness and lookups only cover live rows, see the partial indexes below
+    email: Mapped[str] = mapped_column(String(300))
     hashed_password: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
-    first_name: Mapped[Optional[str]] = mapped_column(String(300), index=True, nullable=True)
-    last_name: Mapped[Optional[str]] = mapped_column(String(300), index=True, nullable=True)
+    first_name: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
+    last_name: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     role: Mapped[Optional[str]] = mapped_column(String(20), default=UserRole.USER.value, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    # written in batches by the login activity buffer, may lag a few seconds
+    last_login_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    login_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # stamped in UTC whatever the session's TimeZone, like the naive column's readers expect
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.timezone("utc", func.now()))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.timezone("utc", func.now()), onupdate=func.timezone("utc", func.now())
+    )
     
     @property
     def role_enum(self) -> Optional[UserRole]:
@@ -36,4 +44,12 @@ class User(Base):
                 return UserRole(self.role)
             except ValueError:
                 return None
-        return None
\ No newline at end of file
+        return None
+
+# soft-deleted rows stay out of the hot indexes until they are archived
+Index("uq_users_email_live", func.lower(User.email), unique=True, postgresql_where=~User.is_deleted)
+Index("ix_users_first_name_live", User.first_name, postgresql_where=~User.is_deleted)
+Index("ix_users_last_name_live", User.last_name, postgresql_where=~User.is_deleted)
+Index("ix_users_deleted_at", User.deleted_at, postgresql_where=User.is_deleted)
+# changes since a watermark, polled by the in-memory user replica
+Index("ix_users_updated_at", User.updated_at)
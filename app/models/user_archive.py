@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+class UserArchive(Base):
+    """Users soft-deleted long enough ago to be moved out of the users table"""
+    __tablename__ = "users_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    email: Mapped[str] = mapped_column(String(300), index=True)
+    hashed_password: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
+    first_name: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
+    last_name: Mapped[Optional[str]] = mapped_column(String(300), nullable=True)
+    is_active: Mapped[bool] = mapped_column(Boolean)
+    is_superuser: Mapped[bool] = mapped_column(Boolean)
+    is_verified: Mapped[bool] = mapped_column(Boolean)
+    role: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    last_login_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    login_count: Mapped[int] = mapped_column(Integer, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
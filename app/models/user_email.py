@@ -0,0 +1,18 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+class UserEmail(Base):
+    """
+    Email to user ID lookup for a hash-partitioned users table.
+
+    A unique index on a partitioned table has to include the partition key,
+    so with users partitioned by id this table carries the global uniqueness
+    of live emails instead, and routes email lookups to one partition.
+    Maintained by a trigger on users; only exists when USERS_PARTITIONS > 0.
+    """
+    __tablename__ = "user_emails"
+
+    email: Mapped[str] = mapped_column(String(300), primary_key=True)  # lower(users.email)
+    user_id: Mapped[int] = mapped_column(Integer)
@@ -1,8 +1,14 @@
-from typing import Dict, Generic, List, Optional, Type, TypeVar, Any, Tuple
-from sqlalchemy import func, select, update, delete, or_
+from typing import Dict, Generic, List, Optional, Sequence, Type, TypeVar, Any, Tuple
+from sqlalchemy import any_, bindparam, func, inspect, select, update, delete, or_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.config import settings
 from app.db.base_class import Base
+from app.repositories.filters import filter_shape, get_filter_plan, get_projection_stmt, live_criteria, model_columns
+from app.repositories.loader import BatchLoader
+from app.repositories.singleflight import read_flights
 
 ModelType = TypeVar("ModelType", bound=Any)
 
@@ -23,6 +29,77 @@ class BaseRepository(Generic[ModelType]):
         """
         self.db = db
         self.model = model
+        # default criteria hiding soft-deleted rows, empty if the model has no is_deleted column
+        self.live = live_criteria(model)
+        # coalesces get() calls issued together into one get_many() query
+        self._loader: BatchLoader[Any, ModelType] = BatchLoader(self.get_many)
+
+    def to_snapshot(self, db_obj: ModelType) -> Dict[str, Any]:
+        """
+        Capture the column values of a record.
+
+        Snapshots are plain dictionaries, safe to keep outside the session
+        (e.g. in a cache) and to share between requests.
+
+        Args:
+            db_obj: Loaded record
+
+        Returns:
+            Dictionary of column attribute values
+        """
+        return {attr.key: getattr(db_obj, attr.key) for attr in inspect(self.model).column_attrs}
+
+    async def from_snapshot(self, values: Dict[str, Any]) -> ModelType:
+        """
+        Attach a record rebuilt from a snapshot to this session without querying.
+
+        Args:
+            values: Snapshot produced by to_snapshot
+
+        Returns:
+            Persistent record bound to this repository's session
+        """
+        db_obj = self.model(**values)
+        make_transient_to_detached(db_obj)
+        return await self.db.merge(db_obj, load=False)
+
+    def _can_share_reads(self) -> bool:
+        # a session inside a transaction holds a connection, and maybe uncommitted writes (Core
+        # statements included): a shared read would take a second connection and miss them
+        if not settings.SINGLEFLIGHT_ENABLED or self.db.in_transaction():
+            return False
+        return not (self.db.new or self.db.dirty or self.db.deleted)
+
+    async def _shared_select(self, label: str, params: Tuple[Any, ...], query: Any) -> List[ModelType]:
+        """
+        Execute a select of records, sharing identical concurrent executions.
+
+        Concurrent callers with the same statement label and parameters share
+        one query, run on a dedicated session; each caller gets the rows
+        attached to its own session. Only callers outside a transaction
+        share: they hold no connection while waiting, and have no
+        uncommitted writes the shared query couldn't see.
+
+        Args:
+            label: Name of the statement, part of the de-duplication key
+            params: Statement parameters, part of the de-duplication key
+            query: Select statement returning model instances
+
+        Returns:
+            List of records
+        """
+        if not self._can_share_reads():
+            result = await self.db.execute(query)
+            return list(result.scalars().all())
+
+        async def run() -> List[Dict[str, Any]]:
+            async with AsyncSession(self.db.bind) as db:
+                result = await db.execute(query)
+                return [self.to_snapshot(obj) for obj in result.scalars().all()]
+
+        name = f"{self.model.__tablename__}.{label}"
+        snapshots = await read_flights.do((name, params), name, run)
+        return [await self.from_snapshot(values) for values in snapshots]
     
     async def get(self, id: Any) -> Optional[ModelType]:
         """
@@ -34,10 +111,55 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Record if found, None otherwise
         """
-        query = select(self.model).where(self.model.id == id)
-        result = await self.db.execute(query)
-        return result.scalars().first()
+        return await self._loader.load(id)
+
+    async def get_many(self, ids: Sequence[Any]) -> List[Optional[ModelType]]:
+        """
+        Get records by ID in a single query.
+        
+        Args:
+            ids: Record IDs
+            
+        Returns:
+            One entry per requested ID, in request order; None where not found
+        """
+        if not ids:
+            return []
+
+        # a single array parameter keeps one statement for any number of ids
+        unique_ids = sorted(set(ids))
+        id_column = self.model.id
+        query = select(self.model).where(
+            id_column == any_(bindparam("ids", unique_ids, type_=ARRAY(id_column.type))),
+            *self.live
+        )
+        by_id = {obj.id: obj for obj in await self._shared_select("get_many", tuple(unique_ids), query)}
+        return [by_id.get(id) for id in ids]
     
+    async def get_many_fields(self, ids: Sequence[Any], fields: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get selected columns of records by ID, without loading model instances.
+        
+        Args:
+            ids: Record IDs
+            fields: Column names to return
+            
+        Returns:
+            One dictionary per requested ID, in request order; None where not found
+        """
+        if not ids:
+            return []
+
+        columns = model_columns(self.model)
+        unique_ids = sorted(set(ids))
+        query = select(self.model.id.label("_id"), *(columns[field] for field in fields)).where(
+            self.model.id == any_(bindparam("ids", unique_ids, type_=ARRAY(self.model.id.type))),
+            *self.live
+        )
+        result = await self.db.execute(query)
+        by_id = {row._id: {field: row[field] for field in fields} for row in result.mappings()}
+        return [by_id.get(id) for id in ids]
+
     async def get_multi(
         self,
         *,
@@ -56,48 +178,52 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Tuple of (list of records, total count)
         """
-        # Create base query
-        query = select(self.model)
-        
-        # Apply filters if provided
-        if filters:
-            for field, value in filters.items():
-                # Handle special case for search fields first
-                if field.endswith("_contains") and value:
-                    field_name = field.replace("_contains", "")
-                    if hasattr(self.model, field_name):
-                        # problem found using integration test, changed to database-agnostic case insensitive search
-                        column = getattr(self.model, field_name)
-                        search_pattern = f"%{value}%"
-                        query = query.where(func.lower(column).like(func.lower(search_pattern)))
-                elif hasattr(self.model, field) and value is not None:
-                    # Handle enum values by converting to string
-                    filter_value = value.value if hasattr(value, 'value') else value
-                    
-                    # Handle boolean fields
-                    if isinstance(filter_value, bool):
-                        query = query.where(getattr(self.model, field) == filter_value)
-                    # Handle list values (IN operator)
-                    elif isinstance(filter_value, list):
-                        query = query.where(getattr(self.model, field).in_(filter_value))
-                    # Default exact match
-                    else:
-                        query = query.where(getattr(self.model, field) == filter_value)
-        
+        # statements are compiled once per filter shape and reused
+        plan = get_filter_plan(self.model, filter_shape(filters))
+        params = plan.params(filters, skip, limit)
+
         # Count total records
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.execute(count_query)
+        total = await self.db.execute(plan.count_stmt, params)
         total = total.scalar_one()
-        
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-        
+
         # Execute query
-        result = await self.db.execute(query)
+        result = await self.db.execute(plan.select_stmt, params)
         items = list(result.scalars().all())
         
         return items, total
     
+    async def get_multi_fields(
+        self,
+        fields: Sequence[str],
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Dict[str, Any] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get selected columns of multiple records, without loading model instances.
+        
+        Args:
+            fields: Column names to return
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            filters: Optional filters dictionary, as for get_multi
+            
+        Returns:
+            Tuple of (list of dictionaries, total count)
+        """
+        shape = filter_shape(filters)
+        plan = get_filter_plan(self.model, shape)
+        params = plan.params(filters, skip, limit)
+
+        total = await self.db.execute(plan.count_stmt, params)
+        total = total.scalar_one()
+
+        result = await self.db.execute(get_projection_stmt(self.model, shape, tuple(fields)), params)
+        items = [dict(row) for row in result.mappings()]
+
+        return items, total
+    
     async def create(self, *, obj_in: Dict[str, Any], commit_txn: Optional[bool] = True) -> ModelType:
         """
         Create a new record.
@@ -165,6 +291,9 @@ class BaseRepository(Generic[ModelType]):
         """
         Delete a record by ID.
         
+        Models with an is_deleted column are soft-deleted: the row is flagged
+        and stamped with deleted_at, and hidden from reads from then on.
+        
         Args:
             id: Record ID
             
@@ -176,9 +305,32 @@ class BaseRepository(Generic[ModelType]):
         if db_obj is None:
             return None
         
-        await self.db.delete(db_obj)
+        if self.live:
+            db_obj.is_deleted = True
+            db_obj.deleted_at = func.now()
+        else:
+            await self.db.delete(db_obj)
+
+        if commit_txn and commit_txn == True:
+            await self.db.commit()
+            if self.live:
+                await self.db.refresh(db_obj)
+
+        return db_obj
+
+    async def hard_delete(self, *, id: Any, commit_txn: Optional[bool] = True) -> bool:
+        """
+        Remove a record by ID, whether soft-deleted or not.
+        
+        Args:
+            id: Record ID
+            
+        Returns:
+            True if a row was removed
+        """
+        result = await self.db.execute(delete(self.model).where(self.model.id == id))
 
         if commit_txn and commit_txn == True:
             await self.db.commit()
 
-        return db_obj
\ No newline at end of file
+        return result.rowcount > 0
@@ -0,0 +1,137 @@
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type
+
+from sqlalchemy import bindparam, func, inspect, not_, select
+from sqlalchemy.sql import Select
+
+CONTAINS_SUFFIX = "_contains"
+SOFT_DELETE_COLUMN = "is_deleted"
+
+class FilterBinding(NamedTuple):
+    key: str  # key in the filters dictionary
+    param: str  # bound parameter name in the statements
+    kind: str  # "eq", "in" or "contains"
+
+class FilterPlan(NamedTuple):
+    """
+    Statements for one model and filter shape, built once and reused.
+
+    The statements only contain bound parameters, so SQLAlchemy computes
+    their cache key once and every execution hits the compiled cache.
+    """
+    bindings: Tuple[FilterBinding, ...]
+    criteria: Tuple[Any, ...]
+    select_stmt: Select
+    count_stmt: Select
+
+    def params(self, filters: Dict[str, Any], skip: int, limit: int) -> Dict[str, Any]:
+        """
+        Bind filter values and pagination to the plan's parameters.
+
+        Args:
+            filters: Filters dictionary the plan was looked up for
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            Parameters for executing select_stmt / count_stmt
+        """
+        params: Dict[str, Any] = {"skip": skip, "limit": limit}
+        for binding in self.bindings:
+            value = _plain(filters[binding.key])
+            params[binding.param] = f"%{value}%" if binding.kind == "contains" else value
+        return params
+
+def _plain(value: Any) -> Any:
+    # enum members are stored as their values
+    return value.value if hasattr(value, "value") else value
+
+def filter_shape(filters: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Describe which filters are active and how they compare, without their values.
+
+    Args:
+        filters: Filters dictionary as passed to get_multi
+
+    Returns:
+        Sorted tuple of (key, kind) pairs
+    """
+    if not filters:
+        return ()
+    shape = []
+    for key, value in filters.items():
+        if key.endswith(CONTAINS_SUFFIX):
+            if value:
+                shape.append((key, "contains"))
+        elif value is not None:
+            shape.append((key, "in" if isinstance(_plain(value), list) else "eq"))
+    return tuple(sorted(shape))
+
+@lru_cache(maxsize=None)
+def model_columns(model: Type[Any]) -> Dict[str, Any]:
+    """Map column attribute names of a model to its instrumented attributes"""
+    return {attr.key: getattr(model, attr.key) for attr in inspect(model).column_attrs}
+
+@lru_cache(maxsize=None)
+def live_criteria(model: Type[Any]) -> Tuple[Any, ...]:
+    """
+    Criteria excluding soft-deleted rows, empty for models without soft delete.
+
+    Written as NOT is_deleted so the partial indexes on live rows apply.
+    """
+    column = model_columns(model).get(SOFT_DELETE_COLUMN)
+    return (not_(column),) if column is not None else ()
+
+@lru_cache(maxsize=256)
+def get_filter_plan(model: Type[Any], shape: Tuple[Tuple[str, str], ...]) -> FilterPlan:
+    """
+    Compile a filter shape for a model into reusable statements.
+
+    Keys that don't name a column of the model are ignored. Soft-deleted
+    rows are excluded unless the shape filters on is_deleted itself.
+
+    Args:
+        model: SQLAlchemy model class
+        shape: Result of filter_shape
+
+    Returns:
+        Cached filter plan
+    """
+    columns = model_columns(model)
+    bindings = []
+    criteria = [] if any(key == SOFT_DELETE_COLUMN for key, _ in shape) else list(live_criteria(model))
+    for key, kind in shape:
+        field = key[:-len(CONTAINS_SUFFIX)] if kind == "contains" else key
+        column = columns.get(field)
+        if column is None:
+            continue
+        param = f"filter_{key}"
+        if kind == "contains":
+            # database-agnostic case insensitive search
+            criteria.append(func.lower(column).like(func.lower(bindparam(param, type_=column.type))))
+        elif kind == "in":
+            criteria.append(column.in_(bindparam(param, expanding=True)))
+        else:
+            criteria.append(column == bindparam(param))
+        bindings.append(FilterBinding(key, param, kind))
+
+    select_stmt = select(model).where(*criteria).offset(bindparam("skip")).limit(bindparam("limit"))
+    count_stmt = select(func.count()).select_from(model).where(*criteria)
+    return FilterPlan(tuple(bindings), tuple(criteria), select_stmt, count_stmt)
+
+@lru_cache(maxsize=256)
+def get_projection_stmt(model: Type[Any], shape: Tuple[Tuple[str, str], ...], fields: Tuple[str, ...]) -> Select:
+    """
+    Build the column-only variant of a filter plan's select.
+
+    Args:
+        model: SQLAlchemy model class
+        shape: Result of filter_shape
+        fields: Column names to select
+
+    Returns:
+        Cached select statement taking the filter plan's parameters
+    """
+    columns = model_columns(model)
+    criteria = get_filter_plan(model, shape).criteria
+    return select(*(columns[field] for field in fields)).where(*criteria).offset(bindparam("skip")).limit(bindparam("limit"))
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.idempotency import IdempotencyKey
+from app.repositories.base import BaseRepository
+
+class IdempotencyRepository(BaseRepository[IdempotencyKey]):
+    """Repository for stored idempotent responses"""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize the repository with database session.
+
+        Args:
+            db: SQLAlchemy async session
+        """
+        super().__init__(db, IdempotencyKey)
+
+    async def get_response(self, scope: str, key: str, ttl: timedelta) -> Optional[IdempotencyKey]:
+        """
+        Get the stored response for a key, unless it expired.
+
+        Args:
+            scope: Operation the key belongs to
+            key: Client-supplied key
+            ttl: How long responses are kept
+
+        Returns:
+            Stored record if present
+        """
+        query = select(IdempotencyKey).where(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at > func.now() - ttl,
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def save(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        status_code: int,
+        response: Dict[str, Any],
+        ttl: timedelta,
+        commit_txn: bool = True
+    ) -> bool:
+        """
+        Store the response for a key, unless one that hasn't expired is stored already.
+
+        A concurrent request storing the same key waits for the first one to
+        commit or roll back.
+
+        Args:
+            scope: Operation the key belongs to
+            key: Client-supplied key
+            fingerprint: Fingerprint of the request body
+            status_code: Response status code
+            response: JSON response body
+            ttl: How long responses are kept
+            commit_txn: Whether to commit the transaction
+
+        Returns:
+            True if the response was stored, False if the key is taken
+        """
+        values = {"fingerprint": fingerprint, "status_code": status_code, "response": response}
+        query = (
+            insert(IdempotencyKey)
+            .values(scope=scope, key=key, **values)
+            # only an expired record with the same key is taken over
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+                set_={**values, "created_at": func.now()},
+                where=IdempotencyKey.created_at <= func.now() - ttl
+            )
+            .returning(IdempotencyKey.key)
+        )
+        result = await self.db.execute(query)
+        stored = result.first() is not None
+
+        if commit_txn:
+            await self.db.commit()
+
+        return stored
+
+    async def purge_expired(self, ttl: timedelta) -> int:
+        """
+        Delete records older than the retention.
+
+        Args:
+            ttl: How long responses are kept
+
+        Returns:
+            Number of deleted rows
+        """
+        result = await self.db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at <= func.now() - ttl))
+        await self.db.commit()
+        return result.rowcount
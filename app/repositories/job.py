@@ -0,0 +1,162 @@
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job, JobStatus
+from app.repositories.base import BaseRepository
+
+class ClaimedJob(NamedTuple):
+    """Job taken by a runner, detached from any session"""
+    id: int
+    type: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    lag_seconds: float  # time between becoming due and being claimed
+
+class JobRepository(BaseRepository[Job]):
+    """Repository for the job queue"""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize the repository with database session.
+
+        Args:
+            db: SQLAlchemy async session
+        """
+        super().__init__(db, Job)
+
+    async def enqueue(
+        self,
+        type: str,
+        payload: Dict[str, Any],
+        *,
+        delay: Optional[timedelta] = None,
+        max_attempts: int = 5,
+        commit_txn: bool = True
+    ) -> Job:
+        """
+        Add a job to the queue.
+
+        Args:
+            type: Job type, selects the handler
+            payload: JSON-serializable handler arguments
+            delay: Run no earlier than this from now
+            max_attempts: Attempts before the job is marked failed
+            commit_txn: Whether to commit; pass False to enqueue within the caller's transaction
+
+        Returns:
+            Added job
+        """
+        job = Job(type=type, payload=payload, status=JobStatus.QUEUED.value, attempts=0, max_attempts=max_attempts)
+        if delay:
+            job.run_at = func.now() + delay
+        self.db.add(job)
+
+        if commit_txn:
+            await self.db.commit()
+
+        return job
+
+    async def claim(self, type: str, limit: int) -> List[ClaimedJob]:
+        """
+        Take due jobs of one type and mark them running.
+
+        Jobs locked by another runner are skipped rather than waited for.
+
+        Args:
+            type: Job type
+            limit: Maximum number of jobs to take
+
+        Returns:
+            Claimed jobs, oldest due first
+        """
+        due = (
+            select(Job.id)
+            .where(Job.status == JobStatus.QUEUED.value, Job.type == type, Job.run_at <= func.now())
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(Job)
+            .where(Job.id.in_(due.scalar_subquery()))
+            .values(status=JobStatus.RUNNING.value, locked_at=func.now(), attempts=Job.attempts + 1)
+            .returning(
+                Job.id, Job.type, Job.payload, Job.attempts, Job.max_attempts,
+                func.extract("epoch", func.now() - Job.run_at).label("lag_seconds"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(query)
+        jobs = [ClaimedJob(row.id, row.type, row.payload, row.attempts, row.max_attempts, float(row.lag_seconds or 0)) for row in result.all()]
+        await self.db.commit()
+        return sorted(jobs, key=lambda job: -job.lag_seconds)
+
+    async def _finish(self, id: int, **values: Any) -> None:
+        query = (
+            update(Job)
+            .where(Job.id == id, Job.status == JobStatus.RUNNING.value)
+            .values(locked_at=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(query)
+        await self.db.commit()
+
+    async def complete(self, id: int) -> None:
+        """Remove a job that ran successfully"""
+        await self.db.execute(delete(Job).where(Job.id == id))
+        await self.db.commit()
+
+    async def retry(self, id: int, error: str, delay: timedelta) -> None:
+        """Put a failed attempt back in the queue after a delay"""
+        await self._finish(id, status=JobStatus.QUEUED.value, run_at=func.now() + delay, last_error=error)
+
+    async def fail(self, id: int, error: str) -> None:
+        """Mark a job as failed for good"""
+        await self._finish(id, status=JobStatus.FAILED.value, last_error=error)
+
+    async def release(self, id: int) -> None:
+        """Return an interrupted job to the queue without counting the attempt"""
+        await self._finish(id, status=JobStatus.QUEUED.value, attempts=Job.attempts - 1)
+
+    async def requeue_stale(self, locked_before: timedelta) -> int:
+        """
+        Return jobs whose runner disappeared to the queue.
+
+        Jobs that used up their attempts are marked as failed instead: a job
+        that keeps taking its runner down must not run forever.
+
+        Args:
+            locked_before: Running jobs locked longer than this are considered abandoned
+
+        Returns:
+            Number of requeued jobs
+        """
+        stale = (Job.status == JobStatus.RUNNING.value, Job.locked_at < func.now() - locked_before)
+        await self.db.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= Job.max_attempts)
+            .values(status=JobStatus.FAILED.value, locked_at=None, last_error="abandoned by runner")
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(
+            update(Job)
+            .where(*stale, Job.attempts < Job.max_attempts)
+            .values(status=JobStatus.QUEUED.value, locked_at=None, last_error="abandoned by runner")
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def count_queued(self) -> Dict[str, int]:
+        """
+        Count queued jobs per type.
+
+        Returns:
+            Mapping of job type to number of queued jobs
+        """
+        query = select(Job.type, func.count()).where(Job.status == JobStatus.QUEUED.value).group_by(Job.type)
+        result = await self.db.execute(query)
+        return {row[0]: row[1] for row in result.all()}
@@ -0,0 +1,98 @@
+import asyncio
+import functools
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class BatchLoader(Generic[K, V]):
+    """
+    DataLoader-style batching of individual loads.
+
+    Keys requested during the same event loop iteration (e.g. from coroutines
+    passed to asyncio.gather) are collected and resolved with a single call
+    to the batch function. Batches run one at a time, so a loader bound to a
+    session never uses it concurrently.
+
+    Results are not memoized across batches: a later load goes back to the
+    database and sees changes committed in between.
+
+    A batch whose callers were all cancelled is cancelled too, so it stops
+    using a session its request may already have closed.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[K]], Awaitable[List[Optional[V]]]], max_batch_size: int = 100):
+        """
+        Initialize the loader.
+
+        Args:
+            batch_fn: Coroutine function returning one result per key, in key order
+            max_batch_size: Maximum number of keys per batch call
+        """
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._scheduled = False
+        self._lock = asyncio.Lock()
+        # running batches, referenced until done
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        """
+        Request a key; the result resolves once its batch ran.
+
+        Args:
+            key: Key to load
+
+        Returns:
+            Future resolving to the value, or None if it does not exist
+        """
+        future = self._pending.get(key)
+        if future is not None and not future.cancelled():
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        if not self._scheduled:
+            self._scheduled = True
+            # let every coroutine already scheduled request its keys first
+            loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        # keys whose callers gave up before the batch started aren't loaded
+        keys = [key for key, future in pending.items() if not future.done()]
+        for start in range(0, len(keys), self._max_batch_size):
+            chunk = {key: pending[key] for key in keys[start:start + self._max_batch_size]}
+            task = asyncio.ensure_future(self._run(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            on_done = functools.partial(self._cancel_if_abandoned, chunk, task)
+            for future in chunk.values():
+                future.add_done_callback(on_done)
+
+    @staticmethod
+    def _cancel_if_abandoned(batch: Dict[K, asyncio.Future], task: asyncio.Task, future: asyncio.Future) -> None:
+        if future.cancelled() and not task.done() and all(f.cancelled() for f in batch.values()):
+            task.cancel()
+
+    async def _run(self, batch: Dict[K, asyncio.Future]) -> None:
+        try:
+            async with self._lock:
+                values = await self._batch_fn(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for future, value in zip(batch.values(), values):
+            if not future.done():
+                future.set_result(value)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.revocation import UserRevocation
+from app.repositories.base import BaseRepository
+
+class RevocationRepository(BaseRepository[UserRevocation]):
+    """Repository for token revocation markers"""
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize the repository with database session.
+
+        Args:
+            db: SQLAlchemy async session
+        """
+        super().__init__(db, UserRevocation)
+
+    async def revoke(self, user_id: int, commit_txn: bool = True) -> datetime:
+        """
+        Revoke every token issued to a user so far.
+
+        Args:
+            user_id: User ID
+            commit_txn: Whether to commit the transaction
+
+        Returns:
+            Revocation time
+        """
+        # revoked_at has no time zone and is compared with token times in UTC:
+        # don't let the session's TimeZone setting shift it
+        now_utc = func.timezone("utc", func.now())
+        query = (
+            insert(UserRevocation)
+            .values(user_id=user_id, revoked_at=now_utc)
+            .on_conflict_do_update(
+                index_elements=[UserRevocation.user_id],
+                set_={"revoked_at": now_utc}
+            )
+            .returning(UserRevocation.revoked_at)
+        )
+        result = await self.db.execute(query)
+        revoked_at = result.scalar_one()
+
+        if commit_txn:
+            await self.db.commit()
+
+        return revoked_at
+
+    async def get_since(self, since: datetime) -> List[Tuple[int, datetime]]:
+        """
+        Get revocations recorded since the last sync.
+
+        Revocations stamped up to SYNC_OVERLAP_SECONDS before the watermark
+        are read again: they may have committed after the last sync.
+
+        Args:
+            since: Latest revoked_at seen so far
+
+        Returns:
+            List of (user_id, revoked_at)
+        """
+        lower_bound = since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        query = select(UserRevocation.user_id, UserRevocation.revoked_at).where(UserRevocation.revoked_at > lower_bound)
+        result = await self.db.execute(query)
+        return [(row.user_id, row.revoked_at) for row in result.all()]
+
+    async def purge_before(self, cutoff: datetime) -> int:
+        """
+        Delete revocations older than any token still accepted.
+
+        Args:
+            cutoff: Revocations at or before this time are deleted
+
+        Returns:
+            Number of deleted rows
+        """
+        result = await self.db.execute(delete(UserRevocation).where(UserRevocation.revoked_at <= cutoff))
+        await self.db.commit()
+        return result.rowcount
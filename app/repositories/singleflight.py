@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from app.core.metrics import metrics
+
+class SingleFlight:
+    """
+    De-duplicate identical concurrent calls.
+
+    The first caller for a key starts the call in its own task; callers
+    arriving while it runs await the same result. A caller being cancelled
+    only detaches it from the flight; the flight itself is cancelled once
+    no caller is left waiting for it.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        """
+        Initialize the group.
+
+        Args:
+            name: Prefix for exported metrics
+        """
+        self.name = name
+        # key -> (task, [number of callers waiting])
+        self._flights: Dict[Hashable, Tuple[asyncio.Task, List[int]]] = {}
+
+    def _count(self, label: str, outcome: str) -> None:
+        metrics.counter(f"{self.name}.{label}.{outcome}").inc()
+
+    async def do(self, key: Hashable, label: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the call, e.g. statement name and parameters
+            label: Low-cardinality name used for metrics
+            fn: Coroutine function performing the call
+
+        Returns:
+            Result of the shared call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = (task, [0])
+            self._flights[key] = flight
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self._count(label, "executed")
+        else:
+            self._count(label, "shared")
+
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            waiters[0] -= 1
+            if waiters[0] == 0 and not task.done():
+                # nobody is interested in the result anymore
+                self._forget(key, task)
+                task.cancel()
+                self._count(label, "cancelled")
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+
+read_flights = SingleFlight("singleflight")
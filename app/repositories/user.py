@@ -1,9 +1,15 @@
-from typing import Optional
-from sqlalchemy import select, func
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, Integer, Row, column, literal, literal_column, select, func, update, delete, insert, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models.user import User
+from app.models.user_archive import UserArchive
+from app.models.user_email import UserEmail
 from app.repositories.base import BaseRepository
+from app.repositories.filters import model_columns
 
 class UserRepository(BaseRepository[User]):
     """Repository for user-related database operations"""
@@ -16,6 +22,16 @@ class UserRepository(BaseRepository[User]):
             db: SQLAlchemy async session
         """
         super().__init__(db, User)
+        # hash-partitioned by id: emails are resolved to ids through user_emails
+        self.partitioned = settings.USERS_PARTITIONS > 0
+
+    def _email_criteria(self, email: str) -> Tuple[Any, ...]:
+        """Criteria selecting the live user with an email (already lower-cased)"""
+        if self.partitioned:
+            # the id comes from an init plan, so only one partition is scanned
+            user_id = select(UserEmail.user_id).where(UserEmail.email == email).scalar_subquery()
+            return (User.id == user_id, *self.live)
+        return (func.lower(User.email) == email, *self.live)
     
     async def get_by_email(self, email: str) -> Optional[User]:
         """
@@ -29,6 +45,275 @@ class UserRepository(BaseRepository[User]):
         """
         # Perform a query to find the user by email
         # make case insensitive        
-        query = select(User).where(func.lower(User.email) == email.lower())
+        email = email.lower()
+        query = select(User).where(*self._email_criteria(email))
+        users = await self._shared_select("get_by_email", (email,), query)
+        return users[0] if users else None
+
+    async def create_if_absent(self, obj_in: Dict[str, Any], commit_txn: bool = True) -> Optional[User]:
+        """
+        Insert a user unless a live user has the same email, in one statement.
+
+        Concurrent inserts of the same email are serialized by the unique
+        index: exactly one succeeds, the others get None.
+
+        Args:
+            obj_in: Column values
+            commit_txn: Whether to commit the transaction
+
+        Returns:
+            Created user, or None if the email is taken
+        """
+        if self.partitioned:
+            query = self._claim_and_insert(obj_in)
+        else:
+            query = (
+                pg_insert(User)
+                .values(**obj_in)
+                .on_conflict_do_nothing(index_elements=[func.lower(User.email)], index_where=~User.is_deleted)
+                .returning(User)
+            )
+        result = await self.db.scalars(query)
+        user = result.one_or_none()
+
+        if commit_txn and user is not None:
+            await self.db.commit()
+
+        return user
+
+    def _claim_and_insert(self, obj_in: Dict[str, Any]):
+        """
+        Single INSERT claiming the email in user_emails, then inserting the user.
+
+        The user row is only inserted when the claim succeeded, with the id
+        the claim drew from the sequence; the sync trigger finds the email
+        already mapped to that id.
+        """
+        claimed = (
+            pg_insert(UserEmail)
+            .values(email=func.lower(obj_in["email"]), user_id=literal_column("nextval('users_id_seq')"))
+            .on_conflict_do_nothing(index_elements=[UserEmail.email])
+            .returning(UserEmail.user_id)
+            .cte("claimed")
+        )
+        columns = User.__table__.c
+        names = list(obj_in)
+        return (
+            insert(User)
+            .from_select(
+                ["id", *names],
+                select(claimed.c.user_id, *(literal(obj_in[name], columns[name].type) for name in names))
+            )
+            .returning(User)
+            .add_cte(claimed, nest_here=True)
+        )
+
+    async def get_updated_at(self, id: int) -> Optional[datetime]:
+        """
+        Get only the last modification time of a user.
+
+        Used to validate conditional requests without loading the full row.
+
+        Args:
+            id: User ID
+
+        Returns:
+            Last modification time if the user exists, None otherwise
+        """
+        query = select(User.updated_at).where(User.id == id, *self.live)
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_version_by_email(self, email: str) -> Optional[Tuple[int, datetime]]:
+        """
+        Get only the ID and last modification time of a user by email.
+
+        Args:
+            email: User email address
+
+        Returns:
+            Tuple of (id, updated_at) if the user exists, None otherwise
+        """
+        query = select(User.id, User.updated_at).where(*self._email_criteria(email.lower()))
+        result = await self.db.execute(query)
+        row = result.first()
+        return (row.id, row.updated_at) if row else None
+
+    async def count_live(self) -> int:
+        """
+        Count users that aren't soft-deleted.
+
+        Returns:
+            Number of live users
+        """
+        result = await self.db.execute(select(func.count()).select_from(User).where(*self.live))
+        return result.scalar_one()
+
+    def _row_columns(self, fields: Optional[Sequence[str]]) -> List[Any]:
+        columns = model_columns(User)
+        return list(columns.values()) if fields is None else [columns[field] for field in fields]
+
+    async def stream_live_rows(
+        self,
+        batch_size: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Read columns of all live users through a server-side cursor.
+
+        Rows are fetched batch by batch, so the whole table never sits in
+        the driver at once.
+
+        Args:
+            batch_size: Rows fetched per round trip
+            fields: Column names to read, all in model_columns order by default
+
+        Yields:
+            Batches of rows
+        """
+        query = (
+            select(*self._row_columns(fields))
+            .where(*self.live)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(query)
+        async for batch in result.partitions():
+            yield batch
+
+    async def get_rows_changed_since(
+        self,
+        watermark: Optional[datetime],
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Row]:
+        """
+        Read columns of users modified since the last sync.
+
+        Rows stamped up to SYNC_OVERLAP_SECONDS before the watermark are
+        read again: they may have committed after the last sync. Soft-deleted
+        users are included, so readers can drop them.
+
+        Args:
+            watermark: Latest updated_at seen so far, None for all users
+            fields: Column names to read, all in model_columns order by default
+
+        Returns:
+            Rows in updated_at order
+        """
+        query = select(*self._row_columns(fields)).order_by(User.updated_at)
+        if watermark is not None:
+            query = query.where(User.updated_at > watermark - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS))
+        result = await self.db.execute(query)
+        return list(result.all())
+
+    async def replace_password_hash(self, id: int, previous_hash: str, new_hash: str) -> bool:
+        """
+        Replace a user's password hash unless it changed in the meantime.
+
+        Args:
+            id: User ID
+            previous_hash: Hash the new one is derived from
+            new_hash: Replacement hash
+
+        Returns:
+            True if the hash was replaced
+        """
+        query = (
+            update(User)
+            .where(User.id == id, User.hashed_password == previous_hash)
+            .values(hashed_password=new_hash)
+        )
+        result = await self.db.execute(query)
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def count_by_password_scheme(self) -> Dict[str, int]:
+        """
+        Count users per password hash prefix.
+
+        For bcrypt the first seven characters hold the variant and cost
+        factor (e.g. "$2b$12$").
+
+        Returns:
+            Mapping of hash prefix to number of users
+        """
+        prefix = func.substr(User.hashed_password, 1, 7).label("prefix")
+        query = (
+            select(prefix, func.count())
+            .where(User.hashed_password.is_not(None), *self.live)
+            .group_by(prefix)
+        )
+        result = await self.db.execute(query)
+        return {row[0]: row[1] for row in result.all()}
+
+    async def archive_deleted(self, older_than: timedelta, batch_size: int) -> int:
+        """
+        Move one batch of long soft-deleted users into the archive table.
+
+        Runs as a single statement and commits. Rows locked by a concurrent
+        archiver are skipped, so several workers can run this at once.
+
+        Args:
+            older_than: Minimum time since deletion
+            batch_size: Maximum number of users to move
+
+        Returns:
+            Number of users archived
+        """
+        columns = [column.name for column in UserArchive.__table__.columns if column.name != "archived_at"]
+        batch = (
+            select(User.id)
+            .where(User.is_deleted, User.deleted_at < func.now() - older_than)
+            .order_by(User.deleted_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        moved = (
+            delete(User)
+            .where(User.id.in_(select(batch.c.id)))
+            .returning(*(User.__table__.c[name] for name in columns))
+            .cte("moved")
+        )
+        query = (
+            insert(UserArchive)
+            .from_select(columns, select(*(moved.c[name] for name in columns)))
+            .returning(UserArchive.id)
+        )
+        result = await self.db.execute(query)
+        archived = len(result.all())
+        await self.db.commit()
+        return archived
+
+    async def record_logins(self, logins: Sequence[Tuple[int, int, datetime]]) -> int:
+        """
+        Apply buffered login activity in one statement.
+
+        Args:
+            logins: (user_id, number of logins, last login time) per user
+
+        Returns:
+            Number of users updated
+        """
+        if not logins:
+            return 0
+
+        batch = values(
+            column("user_id", Integer),
+            column("logins", Integer),
+            column("last_login_at", DateTime),
+            name="batch",
+        ).data(list(logins))
+        query = (
+            update(User)
+            .where(User.id == batch.c.user_id)
+            .values(
+                login_count=func.coalesce(User.login_count, 0) + batch.c.logins,
+                last_login_at=func.greatest(User.last_login_at, batch.c.last_login_at),
+                # activity is not a change to the user: keep updated_at (and ETags) as they are
+                updated_at=User.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
         result = await self.db.execute(query)
-        return result.scalars().first()
\ No newline at end of file
+        await self.db.commit()
+        return result.rowcount
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, validator
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, validator
+from typing_extensions import TypedDict
 
 from app.models.user import UserRole
 
@@ -63,4 +64,38 @@ class UserResponse(UserBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        from_attributes = True
+
+class UserResponseRow(TypedDict):
+    """
+    UserResponse as a plain row read from the database.
+
+    Same fields in the same order, but email is a plain string: it was
+    validated when written, re-validating it on every read is the most
+    expensive part of serializing users.
+    """
+    email: str
+    role: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    is_active: Optional[bool]
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+# built once: validating and serializing a whole list is one call into pydantic-core
+user_rows_adapter = TypeAdapter(List[UserResponseRow])
+optional_user_rows_adapter = TypeAdapter(List[Optional[UserResponseRow]])
+
+class UserPrincipal(BaseModel):
+    """Authenticated user as described by signed token claims"""
+    id: int
+    email: str
+    role: Optional[str] = None
+    is_active: bool = True
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+
+class UserLookupRequest(BaseModel):
+    """Schema for looking up several users by ID"""
+    ids: List[int] = Field(..., min_length=1, max_length=100, description="User IDs to look up")
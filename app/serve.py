@@ -0,0 +1,89 @@
+"""
+Production server entry point.
+
+Runs the application in several uvicorn worker processes on uvloop and
+httptools, so CPU-bound work (bcrypt, serialization) in one worker doesn't
+stall requests handled by the others.
+
+Usage:
+    python -m app.serve [--host 0.0.0.0] [--port 8000] [--workers N]
+
+Per-worker resources are derived from the worker count before the workers
+are spawned (they inherit the environment):
+    DB_POOL_SIZE / DB_MAX_OVERFLOW  DB_POOL_BUDGET split across workers, when set
+    HASHING_POOL_SIZE               CPUs split across workers, unless set explicitly
+"""
+import argparse
+import logging
+import os
+from typing import Dict
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def worker_count(requested: int = 0) -> int:
+    """
+    Resolve the number of worker processes.
+
+    Args:
+        requested: Explicit count, 0 to fall back to WEB_CONCURRENCY or the CPU count
+
+    Returns:
+        Number of workers
+    """
+    return max(1, requested or settings.WEB_CONCURRENCY or os.cpu_count() or 1)
+
+def size_worker_resources(workers: int) -> Dict[str, str]:
+    """
+    Compute per-worker resource settings.
+
+    Each worker has its own connection pool and hashing threads, so totals
+    have to be divided or N workers multiply them N times.
+
+    Args:
+        workers: Number of worker processes
+
+    Returns:
+        Environment variables to set for the workers
+    """
+    env: Dict[str, str] = {}
+    if settings.DB_POOL_BUDGET:
+        # hard cap: no overflow, the budget is what the database was sized for
+        env["DB_POOL_SIZE"] = str(max(1, settings.DB_POOL_BUDGET // workers))
+        env["DB_MAX_OVERFLOW"] = "0"
+    if "HASHING_POOL_SIZE" not in os.environ:
+        env["HASHING_POOL_SIZE"] = str(max(1, (os.cpu_count() or 1) // workers))
+    return env
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: WEB_CONCURRENCY or CPU count)")
+    args = parser.parse_args()
+
+    workers = worker_count(args.workers)
+    env = size_worker_resources(workers)
+    os.environ.update(env)
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    logger.info("Starting %d workers on %s:%d with %s", workers, args.host, args.port, env or "configured pool sizes")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        # on SIGTERM stop accepting, let in-flight requests finish, then run lifespan shutdown
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+        # requests are logged by LoggingMiddleware
+        access_log=False,
+    )
+
+if __name__ == "__main__":
+    main()
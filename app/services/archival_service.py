@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.repositories.idempotency import IdempotencyRepository
+from app.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+_archived = metrics.counter("users.archived", "Soft-deleted users moved to the archive table")
+
+async def archive_deleted_users() -> int:
+    """
+    Archive every user soft-deleted longer than USER_ARCHIVE_AFTER_DAYS.
+
+    Works in small batches, each its own short transaction, pausing in
+    between so the archiver never holds many row locks or saturates the
+    database.
+
+    Returns:
+        Number of users archived
+    """
+    older_than = timedelta(days=settings.USER_ARCHIVE_AFTER_DAYS)
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            archived = await UserRepository(db).archive_deleted(older_than, settings.USER_ARCHIVE_BATCH_SIZE)
+        total += archived
+        _archived.inc(archived)
+        if archived < settings.USER_ARCHIVE_BATCH_SIZE:
+            return total
+        await asyncio.sleep(settings.USER_ARCHIVE_BATCH_PAUSE_MS / 1000)
+
+async def purge_idempotency_keys() -> int:
+    """
+    Delete stored idempotent responses older than IDEMPOTENCY_KEY_TTL_HOURS.
+
+    Returns:
+        Number of records deleted
+    """
+    async with AsyncSessionLocal() as db:
+        return await IdempotencyRepository(db).purge_expired(timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS))
+
+_archive_task: Optional[asyncio.Task] = None
+
+async def _archive_loop() -> None:
+    while True:
+        try:
+            archived = await archive_deleted_users()
+            if archived:
+                logger.info("Archived deleted users", extra={"fields": {"archived": archived}})
+        except Exception as e:
+            logger.error("User archival failed", extra={"fields": {"error": str(e)}})
+        try:
+            purged = await purge_idempotency_keys()
+            if purged:
+                logger.info("Purged expired idempotency keys", extra={"fields": {"purged": purged}})
+        except Exception as e:
+            logger.error("Idempotency key purge failed", extra={"fields": {"error": str(e)}})
+        await asyncio.sleep(settings.USER_ARCHIVE_INTERVAL_SECONDS)
+
+async def start_user_archival() -> None:
+    """Start archiving soft-deleted users in the background"""
+    global _archive_task
+    if settings.USER_ARCHIVE_ENABLED and _archive_task is None:
+        _archive_task = asyncio.create_task(_archive_loop(), name="user-archival")
+
+async def stop_user_archival() -> None:
+    """Stop the background archival"""
+    global _archive_task
+    if _archive_task is not None:
+        _archive_task.cancel()
+        try:
+            await _archive_task
+        except asyncio.CancelledError:
+            pass
+        _archive_task = None
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+import asyncpg
+
+from app.cache import get_user_cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.email_filter import email_filter
+from app.services.user_replica import user_replica
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# sent by the users triggers (migrations 0007 and 0010) at commit
+CHANNEL = "user_changed"
+
+class InvalidationListener:
+    """
+    Evicts cached users changed by any worker, from Postgres notifications.
+
+    Holds one dedicated connection (outside the pool) listening on the
+    user_changed channel. Notifications sent while it isn't listening are
+    lost, so every (re)connect flushes the whole local cache.
+
+    Delivery lag is measured from the trigger's clock_timestamp() to
+    receipt, so it includes the rest of the writing transaction and any
+    clock skew between the database and this host.
+    """
+
+    def __init__(self):
+        self._received = metrics.counter("user_cache.invalidations", "Invalidation notifications received")
+        self._flushes = metrics.counter("user_cache.flushes", "Full flushes after (re)connecting the listener")
+        self._lag = metrics.histogram("user_cache.invalidation_lag", "Seconds from the change to its notification arriving")
+        self._connected = metrics.gauge("user_cache.invalidation_connected", "Whether the invalidation listener is connected")
+
+    async def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        cache = get_user_cache()
+        try:
+            change = json.loads(payload)
+            keys = UserService.cache_keys(change["id"], *change.get("emails") or ())
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed invalidation notification", extra={"fields": {"payload": payload[:200]}})
+            if cache is not None:
+                await cache.clear()
+            return
+
+        self._received.inc()
+        if "at" in change:
+            self._lag.observe(max(0.0, time.time() - float(change["at"])))
+        user_replica.invalidate(change["id"])
+        email_filter.add(*change.get("emails") or ())
+        if cache is not None:
+            await cache.invalidate(*keys)
+
+    async def _flush(self) -> None:
+        cache = get_user_cache()
+        if cache is not None:
+            await cache.clear()
+        self._flushes.inc()
+
+    async def listen_once(self) -> None:
+        """Connect, flush and process notifications until the connection fails"""
+        dsn = settings.SQLALCHEMY_DATABASE_URI.replace("postgresql+asyncpg://", "postgresql://", 1)
+        connection = await asyncpg.connect(dsn)
+        try:
+            await connection.add_listener(CHANNEL, self._on_notification)
+            # anything sent before LISTEN took effect may be cached by now
+            await self._flush()
+            email_filter.listening_started()
+            self._connected.set(1)
+            logger.info("Listening for user changes", extra={"fields": {"channel": CHANNEL}})
+
+            # a silently dropped connection only shows up when used
+            while True:
+                await asyncio.sleep(settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS)
+                await connection.execute("SELECT 1", timeout=settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS)
+        finally:
+            email_filter.listening_stopped()
+            self._connected.set(0)
+            connection.terminate()
+
+    async def run(self) -> None:
+        """Listen forever, reconnecting with backoff"""
+        delay = settings.CACHE_INVALIDATION_RECONNECT_SECONDS
+        while True:
+            started = time.monotonic()
+            try:
+                await self.listen_once()
+            except Exception as e:
+                logger.error("Invalidation listener disconnected", extra={"fields": {"error": repr(e)}})
+            # a connection that held for a while starts the backoff over
+            if time.monotonic() - started > settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS:
+                delay = settings.CACHE_INVALIDATION_RECONNECT_SECONDS
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.CACHE_INVALIDATION_MAX_RECONNECT_SECONDS)
+
+invalidation_listener = InvalidationListener()
+
+_listen_task: Optional[asyncio.Task] = None
+
+async def start_cache_invalidation() -> None:
+    """Start listening for user changes when there is a local cache, replica or email filter to keep in sync"""
+    global _listen_task
+    has_local_copy = get_user_cache() is not None or settings.USER_REPLICA_ENABLED or settings.EMAIL_FILTER_ENABLED
+    if settings.CACHE_INVALIDATION_ENABLED and has_local_copy and _listen_task is None:
+        _listen_task = asyncio.create_task(invalidation_listener.run(), name="cache-invalidation")
+
+async def stop_cache_invalidation() -> None:
+    """Stop the listener"""
+    global _listen_task
+    if _listen_task is not None:
+        _listen_task.cancel()
+        try:
+            await _listen_task
+        except asyncio.CancelledError:
+            pass
+        _listen_task = None
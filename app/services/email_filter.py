@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+# room for registrations before the next rebuild
+GROWTH_FACTOR = 2
+MIN_CAPACITY = 1024
+LOAD_BATCH_SIZE = 10000
+
+class BloomFilter:
+    """
+    Set of strings answering "maybe present" or "definitely absent".
+
+    Sized for a number of entries and a false positive rate; entries can't
+    be removed, and adding more than the capacity raises the rate.
+    """
+    __slots__ = ("capacity", "size", "hashes", "count", "_bits")
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        # two halves of one hash, combined into k positions (Kirsch-Mitzenmacher)
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        """Add a key; keys the filter already reports as present aren't counted"""
+        bits = self._bits
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected rate at the current number of entries"""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+class EmailFilter:
+    """
+    Per-worker Bloom filter of the emails of live users.
+
+    Lets lookups of unregistered emails (typos, scanners, credential
+    stuffing) skip the database: an email the filter has never seen can't
+    belong to a user. Emails written by this worker are added right away,
+    registrations and email changes on other workers as the invalidation
+    listener reports them, and anything else by polling rows whose
+    updated_at passed the watermark.
+
+    A miss is only trusted while nothing can be missing: the listener has
+    to be connected, and the filter synced since it started listening
+    (notifications before that are lost). Otherwise, like when the filter
+    hasn't synced recently, every lookup is let through.
+
+    Deleted users and old emails stay in the filter as false positives
+    until the periodic rebuild, which also resizes it.
+    """
+
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        # emails added while a rebuild reads the table, replayed into the new filter
+        self._pending: Optional[List[str]] = None
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._built_at: Optional[float] = None
+        # start of the last completed sync, and since when the invalidation listener is connected
+        self._covered_since: Optional[float] = None
+        self._listening_since: Optional[float] = None
+        self._skipped = metrics.counter("email_filter.skipped", "Email lookups answered without querying the database")
+        self._false_positives = metrics.counter(
+            "email_filter.false_positives", "Email lookups let through by the filter that found no user"
+        )
+        metrics.register_collector("email_filter.false_positive_rate", lambda: {
+            "email_filter.entries": self._filter.count if self._filter else 0,
+            "email_filter.false_positive_rate": self.observed_false_positive_rate,
+            "email_filter.expected_false_positive_rate": self._filter.false_positive_rate if self._filter else None,
+        })
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the filter was synced recently enough to be trusted"""
+        return (
+            self._synced_at is not None
+            and time.monotonic() - self._synced_at <= settings.EMAIL_FILTER_MAX_STALENESS_SECONDS
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every email of a live user is known to be in the filter"""
+        return (
+            self._filter is not None
+            and self.is_fresh
+            and self._listening_since is not None
+            and self._covered_since is not None
+            and self._covered_since >= self._listening_since
+        )
+
+    @property
+    def observed_false_positive_rate(self) -> Optional[float]:
+        """Share of lookups of unknown emails the filter let through"""
+        skipped = self._skipped.snapshot()
+        false_positives = self._false_positives.snapshot()
+        total = skipped + false_positives
+        return false_positives / total if total else None
+
+    def might_exist(self, email: str) -> bool:
+        """
+        Check whether a user may have an email.
+
+        Args:
+            email: Email address, any case
+
+        Returns:
+            False only if no live user has the email
+        """
+        if not self.is_complete:
+            return True
+        if email.lower() in self._filter:
+            return True
+        self._skipped.inc()
+        return False
+
+    def record_miss(self) -> None:
+        """Count a lookup the filter let through that found no user"""
+        if self.is_complete:
+            self._false_positives.inc()
+
+    def add(self, *emails: Optional[str]) -> None:
+        """Add emails that may belong to a user from now on"""
+        for email in emails:
+            if not email:
+                continue
+            key = email.lower()
+            if self._filter is not None:
+                self._filter.add(key)
+            if self._pending is not None:
+                self._pending.append(key)
+
+    def listening_started(self) -> None:
+        """Called by the invalidation listener once it receives notifications"""
+        self._listening_since = time.monotonic()
+
+    def listening_stopped(self) -> None:
+        """Called by the invalidation listener when its connection is gone"""
+        self._listening_since = None
+
+    async def rebuild(self) -> None:
+        """Replace the filter with one built from the emails of all live users"""
+        started = time.monotonic()
+        watermark = None
+        self._pending = []
+        try:
+            async with AsyncSessionLocal() as db:
+                repo = UserRepository(db)
+                capacity = max(await repo.count_live() * GROWTH_FACTOR, MIN_CAPACITY)
+                bloom = BloomFilter(capacity, settings.EMAIL_FILTER_FALSE_POSITIVE_RATE)
+                async for batch in repo.stream_live_rows(LOAD_BATCH_SIZE, ("email", "updated_at")):
+                    for email, updated_at in batch:
+                        bloom.add(email.lower())
+                        if watermark is None or updated_at > watermark:
+                            watermark = updated_at
+            for key in self._pending:
+                bloom.add(key)
+        finally:
+            self._pending = None
+
+        self._filter = bloom
+        self._watermark = watermark
+        self._built_at = self._synced_at = time.monotonic()
+        self._covered_since = started
+        logger.info(
+            "Built email filter",
+            extra={"fields": {
+                "entries": bloom.count,
+                "bytes": (bloom.size + 7) // 8,
+                "duration_ms": round((self._built_at - started) * 1000, 1),
+            }},
+        )
+
+    async def poll(self) -> None:
+        """Add emails of users changed since the last sync"""
+        started = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            rows = await UserRepository(db).get_rows_changed_since(self._watermark, ("email", "is_deleted", "updated_at"))
+
+        for email, is_deleted, updated_at in rows:
+            if not is_deleted:
+                self._filter.add(email.lower())
+            if self._watermark is None or updated_at > self._watermark:
+                self._watermark = updated_at
+        self._synced_at = time.monotonic()
+        self._covered_since = started
+
+    async def sync(self) -> None:
+        """Poll for new emails, or rebuild when due or full"""
+        if (
+            self._filter is None
+            or self._filter.count > self._filter.capacity
+            or time.monotonic() - self._built_at > settings.EMAIL_FILTER_REBUILD_SECONDS
+        ):
+            await self.rebuild()
+        else:
+            await self.poll()
+
+email_filter = EmailFilter()
+
+_sync_task: Optional[asyncio.Task] = None
+
+async def _sync_loop() -> None:
+    while True:
+        try:
+            await email_filter.sync()
+        except Exception as e:
+            logger.error("Email filter sync failed", extra={"fields": {"error": str(e)}})
+        await asyncio.sleep(settings.EMAIL_FILTER_SYNC_SECONDS)
+
+async def start_email_filter() -> None:
+    """Build the email filter and keep it in sync in the background when enabled"""
+    global _sync_task
+    if settings.EMAIL_FILTER_ENABLED and _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop(), name="email-filter")
+
+async def stop_email_filter() -> None:
+    """Stop the background sync"""
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
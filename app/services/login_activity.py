@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+BATCH_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000)
+
+class LoginActivityBuffer:
+    """
+    Write-behind buffer for login activity.
+
+    Logins are coalesced per user in memory (count and latest time) and
+    written periodically with one UPDATE ... FROM (VALUES ...) per batch,
+    instead of one UPDATE per login on the hot path. At most
+    LOGIN_ACTIVITY_MAX_PENDING users are buffered; logins of further users
+    are dropped and counted until the next flush makes room.
+    """
+
+    def __init__(self):
+        # user_id -> [logins, last login]
+        self._pending: Dict[int, List] = {}
+        self._lock = asyncio.Lock()
+        self._events = metrics.counter("login_activity.events", "Logins recorded")
+        self._dropped = metrics.counter("login_activity.dropped", "Logins dropped because the buffer was full")
+        self._failures = metrics.counter("login_activity.flush_failures", "Flushes that failed and were retried")
+        self._flush_seconds = metrics.histogram("login_activity.flush_seconds", "Time to write one flush")
+        self._batch_size = metrics.histogram("login_activity.batch_size", "Users written per flush", BATCH_BUCKETS)
+        metrics.register_collector("login_activity.pending", lambda: {"login_activity.pending": len(self._pending)})
+
+    def record(self, user_id: int, at: Optional[datetime] = None) -> None:
+        """Record a successful login; never blocks or touches the database"""
+        entry = self._pending.get(user_id)
+        if entry is None:
+            if len(self._pending) >= settings.LOGIN_ACTIVITY_MAX_PENDING:
+                self._dropped.inc()
+                return
+            entry = self._pending[user_id] = [0, None]
+        entry[0] += 1
+        entry[1] = at or datetime.utcnow()
+        self._events.inc()
+
+    def _restore(self, logins: List[Tuple[int, int, datetime]]) -> None:
+        # put a failed batch back, merged with what arrived meanwhile
+        for user_id, count, last_at in logins:
+            entry = self._pending.get(user_id)
+            if entry is None:
+                if len(self._pending) >= settings.LOGIN_ACTIVITY_MAX_PENDING:
+                    self._dropped.inc(count)
+                    continue
+                self._pending[user_id] = [count, last_at]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], last_at)
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far.
+
+        Returns:
+            Number of users written
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            logins = [(user_id, count, last_at) for user_id, (count, last_at) in pending.items()]
+
+            started = time.perf_counter()
+            written = 0
+            try:
+                async with AsyncSessionLocal() as db:
+                    repo = UserRepository(db)
+                    for start in range(0, len(logins), settings.LOGIN_ACTIVITY_BATCH_SIZE):
+                        batch = logins[start:start + settings.LOGIN_ACTIVITY_BATCH_SIZE]
+                        await repo.record_logins(batch)
+                        written += len(batch)
+            except Exception:
+                self._failures.inc()
+                self._restore(logins[written:])
+                raise
+            finally:
+                self._flush_seconds.observe(time.perf_counter() - started)
+                if written:
+                    self._batch_size.observe(written)
+            return written
+
+login_activity = LoginActivityBuffer()
+
+_flush_task: Optional[asyncio.Task] = None
+
+async def _flush_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.LOGIN_ACTIVITY_FLUSH_SECONDS)
+        try:
+            # a flush interrupted by shutdown would lose its batch; the final flush waits for it instead
+            await asyncio.shield(login_activity.flush())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Login activity flush failed", extra={"fields": {"error": str(e)}})
+
+async def start_login_activity() -> None:
+    """Start flushing login activity in the background"""
+    global _flush_task
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_loop(), name="login-activity-flush")
+
+async def stop_login_activity() -> None:
+    """Stop the background flush and write what is still buffered"""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    try:
+        await login_activity.flush()
+    except Exception as e:
+        logger.error("Final login activity flush failed", extra={"fields": {"error": str(e)}})
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.repositories.revocation import RevocationRepository
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 3600
+
+def _epoch(value: datetime) -> float:
+    # timestamps are stored without timezone and written by the database in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class RevocationList:
+    """
+    In-memory view of token revocations, keyed by user ID.
+
+    Each entry holds the time of the user's latest revocation; tokens issued
+    at or before it are rejected. Entries older than the stateless token
+    lifetime can't match a live token and are pruned.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[int, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._purged_at = 0.0
+        metrics.register_collector("revocations.size", lambda: {"revocations.size": len(self._revoked)})
+
+    @property
+    def retention(self) -> timedelta:
+        return timedelta(minutes=settings.STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the list was synced recently enough to be trusted"""
+        return (
+            self._synced_at is not None
+            and time.monotonic() - self._synced_at <= settings.REVOCATION_MAX_STALENESS_SECONDS
+        )
+
+    def revoke(self, user_id: int, revoked_at: datetime) -> None:
+        """Record a revocation"""
+        at = _epoch(revoked_at)
+        if at > self._revoked.get(user_id, -math.inf):
+            self._revoked[user_id] = at
+
+    def is_revoked(self, user_id: int, issued_at: float) -> bool:
+        """Check whether a token issued at the given time has been revoked"""
+        return issued_at <= self._revoked.get(user_id, -math.inf)
+
+    def clear(self) -> None:
+        """Forget everything and require a full reload"""
+        self._revoked.clear()
+        self._watermark = None
+        self._synced_at = None
+
+    async def sync(self) -> None:
+        """Pull revocations recorded since the last sync"""
+        since = self._watermark if self._watermark is not None else datetime.utcnow() - self.retention
+
+        async with AsyncSessionLocal() as db:
+            repo = RevocationRepository(db)
+            rows = await repo.get_since(since)
+            if time.monotonic() - self._purged_at > PURGE_INTERVAL_SECONDS:
+                await repo.purge_before(datetime.utcnow() - 2 * self.retention)
+                self._purged_at = time.monotonic()
+
+        for user_id, revoked_at in rows:
+            self.revoke(user_id, revoked_at)
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+        if self._watermark is None:
+            self._watermark = since
+
+        cutoff = time.time() - self.retention.total_seconds()
+        for user_id in [user_id for user_id, at in self._revoked.items() if at < cutoff]:
+            del self._revoked[user_id]
+
+        self._synced_at = time.monotonic()
+
+revocation_list = RevocationList()
+
+_sync_task: Optional[asyncio.Task] = None
+
+async def _sync_loop() -> None:
+    while True:
+        try:
+            await revocation_list.sync()
+        except Exception as e:
+            logger.error("Revocation sync failed", extra={"fields": {"error": str(e)}})
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+async def start_revocation_sync() -> None:
+    """Start syncing revocations in the background when stateless auth is enabled"""
+    global _sync_task
+    if settings.AUTH_STATELESS and _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop(), name="revocation-sync")
+
+async def stop_revocation_sync() -> None:
+    """Stop the background sync"""
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.repositories.filters import model_columns
+from app.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = tuple(model_columns(User))
+
+class ReplicaUser:
+    """One replicated user: the row's column values, without ORM state"""
+    __slots__ = COLUMNS
+
+    def __init__(self, row: Sequence[Any]):
+        for name, value in zip(COLUMNS, row):
+            setattr(self, name, value)
+        # a handful of distinct roles, shared by all users
+        if self.role is not None:
+            self.role = sys.intern(self.role)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Column values in the format of UserRepository.to_snapshot"""
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def fields(self, names: Sequence[str]) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in names}
+
+def _email_key(email: str) -> str:
+    key = email.lower()
+    # most emails are stored lower-cased already: share the string
+    return email if key == email else key
+
+class UserReplica:
+    """
+    In-memory copy of the live users, indexed by ID and lower-cased email.
+
+    Loaded with a server-side cursor, then kept up to date by polling rows
+    whose updated_at passed the watermark, and reloaded in full from time
+    to time, which also drops hard-deleted users. Changes that keep
+    updated_at (login activity) only show up with the next full reload.
+
+    Reads are only served while the last sync is recent enough; misses
+    always fall through to the database, so a user created elsewhere is
+    found before the replica heard of it. Users written by this worker, or
+    reported changed by the invalidation listener, are looked up in the
+    database until the next poll brings their new row.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, ReplicaUser] = {}
+        self._by_email: Dict[str, ReplicaUser] = {}
+        # IDs in order for listing, rebuilt when users come or go
+        self._ordered: Optional[List[int]] = None
+        self._stale_ids: Set[int] = set()
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._loaded_at: Optional[float] = None
+        self._hits = metrics.counter("user_replica.hits", "Reads served by the user replica")
+        self._misses = metrics.counter("user_replica.misses", "Reads passed on to the database while the replica is fresh")
+        self._changes = metrics.counter("user_replica.changes", "Changed rows applied to the user replica")
+        self._load_time = metrics.histogram("user_replica.load_time", "Seconds to load the user replica in full")
+        metrics.register_collector("user_replica.size", lambda: {
+            "user_replica.size": len(self._by_id),
+            "user_replica.staleness_seconds": self.staleness,
+        })
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """Seconds since the last successful sync, None before the first"""
+        return None if self._synced_at is None else time.monotonic() - self._synced_at
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the replica was synced recently enough to be served"""
+        staleness = self.staleness
+        return staleness is not None and staleness <= settings.USER_REPLICA_MAX_STALENESS_SECONDS
+
+    def _lookup(self, record: Optional[ReplicaUser]) -> Optional[Dict[str, Any]]:
+        if record is None or record.id in self._stale_ids:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        return record.snapshot()
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a user by ID.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Snapshot of the user, None if the database has to be asked
+        """
+        if not self.is_fresh:
+            return None
+        return self._lookup(self._by_id.get(user_id))
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a user by email, case-insensitively.
+
+        Args:
+            email: User email address
+
+        Returns:
+            Snapshot of the user, None if the database has to be asked
+        """
+        if not self.is_fresh:
+            return None
+        return self._lookup(self._by_email.get(_email_key(email)))
+
+    def list_fields(self, fields: Sequence[str], skip: int = 0, limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """
+        List selected fields of users in ID order.
+
+        Unlike lookups, users pending a re-read are listed with the values
+        of the last sync.
+
+        Args:
+            fields: Column names to return
+            skip: Number of users to skip
+            limit: Maximum number of users to return
+
+        Returns:
+            One dictionary per user, None if the database has to be asked
+        """
+        if not self.is_fresh:
+            return None
+        if self._ordered is None:
+            self._ordered = sorted(self._by_id)
+        self._hits.inc()
+        return [self._by_id[user_id].fields(fields) for user_id in self._ordered[skip:skip + limit]]
+
+    def invalidate(self, user_id: int) -> None:
+        """Send lookups of a user to the database until its next change is synced"""
+        if user_id in self._by_id:
+            self._stale_ids.add(user_id)
+
+    def _apply(self, row: Sequence[Any]) -> None:
+        record = ReplicaUser(row)
+        previous = self._by_id.pop(record.id, None)
+        if previous is not None:
+            key = _email_key(previous.email)
+            if self._by_email.get(key) is previous:
+                del self._by_email[key]
+
+        if not record.is_deleted:
+            self._by_id[record.id] = record
+            self._by_email[_email_key(record.email)] = record
+        if (previous is None) != record.is_deleted:
+            self._ordered = None
+        self._stale_ids.discard(record.id)
+
+    async def load(self) -> None:
+        """Replace the replica with a full copy of the live users"""
+        started = time.monotonic()
+        pending = set(self._stale_ids)
+        by_id: Dict[int, ReplicaUser] = {}
+        by_email: Dict[str, ReplicaUser] = {}
+        watermark = None
+
+        async with AsyncSessionLocal() as db:
+            async for batch in UserRepository(db).stream_live_rows(settings.USER_REPLICA_LOAD_BATCH_SIZE):
+                for row in batch:
+                    record = ReplicaUser(row)
+                    by_id[record.id] = record
+                    by_email[_email_key(record.email)] = record
+                    if watermark is None or record.updated_at > watermark:
+                        watermark = record.updated_at
+
+        self._by_id, self._by_email, self._ordered = by_id, by_email, None
+        # marked before the load started: the copy has their change
+        self._stale_ids -= pending
+        self._watermark = watermark
+        self._loaded_at = self._synced_at = time.monotonic()
+
+        elapsed = self._loaded_at - started
+        self._load_time.observe(elapsed)
+        logger.info(
+            "Loaded user replica",
+            extra={"fields": {"users": len(by_id), "duration_ms": round(elapsed * 1000, 1)}},
+        )
+
+    async def poll(self) -> None:
+        """Apply users changed since the last sync"""
+        async with AsyncSessionLocal() as db:
+            rows = await UserRepository(db).get_rows_changed_since(self._watermark)
+
+        applied = 0
+        for row in rows:
+            if self._watermark is None or row.updated_at > self._watermark:
+                self._watermark = row.updated_at
+            current = self._by_id.get(row.id)
+            # most rows of the overlap are applied already
+            if current is not None and current.updated_at == row.updated_at and row.id not in self._stale_ids:
+                continue
+            self._apply(row)
+            applied += 1
+        self._changes.inc(applied)
+        self._synced_at = time.monotonic()
+
+    async def sync(self) -> None:
+        """Poll for changes, or reload in full when due"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.USER_REPLICA_FULL_RELOAD_SECONDS:
+            await self.load()
+        else:
+            await self.poll()
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Estimate the memory held by the replica.
+
+        Walks every record, so it is meant for occasional inspection.
+        Values shared between records (None, booleans, interned roles) are
+        not counted.
+
+        Returns:
+            Number of users and estimated bytes per part
+        """
+        records = values = 0
+        for record in self._by_id.values():
+            records += sys.getsizeof(record)
+            for name in COLUMNS:
+                value = getattr(record, name)
+                if value is not None and not isinstance(value, bool) and name != "role":
+                    values += sys.getsizeof(value)
+        indexes = sys.getsizeof(self._by_id) + sys.getsizeof(self._by_email)
+        indexes += sum(sys.getsizeof(key) for key, record in self._by_email.items() if key is not record.email)
+        if self._ordered is not None:
+            indexes += sys.getsizeof(self._ordered)
+        total = records + values + indexes
+
+        return {
+            "users": len(self._by_id),
+            "records_bytes": records,
+            "values_bytes": values,
+            "indexes_bytes": indexes,
+            "total_bytes": total,
+            "bytes_per_user": round(total / len(self._by_id), 1) if self._by_id else 0,
+            "staleness_seconds": self.staleness,
+            "pending_reread": len(self._stale_ids),
+        }
+
+user_replica = UserReplica()
+
+_sync_task: Optional[asyncio.Task] = None
+
+async def _sync_loop() -> None:
+    while True:
+        try:
+            await user_replica.sync()
+        except Exception as e:
+            logger.error("User replica sync failed", extra={"fields": {"error": str(e)}})
+        await asyncio.sleep(settings.USER_REPLICA_POLL_SECONDS)
+
+async def start_user_replica() -> None:
+    """Load the user replica and keep it in sync in the background when enabled"""
+    global _sync_task
+    if settings.USER_REPLICA_ENABLED and _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop(), name="user-replica")
+
+async def stop_user_replica() -> None:
+    """Stop the background sync"""
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
@@ -1,36 +1,172 @@
-from typing import List, Optional, Union
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from app.core.security import get_password_hash
+from app.cache.read_through import ReadThroughCache
+from app.core.security import get_password_cost, get_password_hash_async
+from app.jobs import get_job_type
+from app.models.job import Job
 from app.models.user import User
+from app.repositories.job import JobRepository
+from app.repositories.revocation import RevocationRepository
 from app.repositories.user import UserRepository
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.email_filter import email_filter
+from app.services.revocation_service import revocation_list
+from app.services.user_replica import user_replica
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# changes that make claims in already issued tokens wrong
+TOKEN_INVALIDATING_FIELDS = {"email", "role", "is_active", "hashed_password"}
+
 class UserService:    
 
-    def __init__(self, db: AsyncSession, user_repo: UserRepository):
-        """Initialize with user repository"""
+    def __init__(
+        self,
+        db: AsyncSession,
+        user_repo: UserRepository,
+        cache: Optional[ReadThroughCache] = None,
+        revocation_repo: Optional[RevocationRepository] = None,
+        job_repo: Optional[JobRepository] = None
+    ):
+        """Initialize with user repository, optional read-through cache, revocation and job repositories"""
         self.db = db
         self.user_repo = user_repo
+        self.cache = cache
+        self.revocation_repo = revocation_repo
+        self.job_repo = job_repo or JobRepository(db)
+
+    @staticmethod
+    def _id_key(user_id: int) -> str:
+        return f"id:{user_id}"
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"email:{email.lower()}"
+
+    @classmethod
+    def cache_keys(cls, user_id: Optional[int], *emails: Optional[str]) -> List[str]:
+        """Cache keys under which a user may be stored"""
+        keys = [cls._email_key(email) for email in emails if email]
+        if user_id is not None:
+            keys.append(cls._id_key(user_id))
+        return keys
+
+    async def _invalidate(self, user_id: Optional[int], *emails: Optional[str]) -> None:
+        """Drop cached entries touched by a write"""
+        # the write may have given a user one of these emails
+        email_filter.add(*emails)
+        if user_id is not None:
+            user_replica.invalidate(user_id)
+        if self.cache is None:
+            return
+        await self.cache.invalidate(*self.cache_keys(user_id, *emails))
+
+    async def _revoke_tokens(self, user_id: int) -> Optional[datetime]:
+        """Reject tokens issued to the user so far; committed with the caller's write"""
+        if self.revocation_repo is None:
+            return None
+        return await self.revocation_repo.revoke(user_id, commit_txn=False)
+
+    async def enqueue_job(self, type: str, payload: Dict[str, Any], delay: Optional[timedelta] = None) -> Job:
+        """Add a job to the session; it is committed with this service's next write, or not at all"""
+        job_type = get_job_type(type)
+        return await self.job_repo.enqueue(
+            type,
+            payload,
+            delay=delay,
+            max_attempts=job_type.max_attempts if job_type else 5,
+            commit_txn=False
+        )
 
     async def get(self, user_id: int) -> Optional[User]:
         """Get a user by ID"""
-        result = await self.user_repo.get(user_id)
-        return result
+        values = user_replica.get(user_id)
+        if values is not None:
+            return await self.user_repo.from_snapshot(values)
+        if self.cache is None:
+            return await self.user_repo.get(user_id)
+
+        async def load() -> Optional[Dict[str, Any]]:
+            user = await self.user_repo.get(user_id)
+            return self.user_repo.to_snapshot(user) if user else None
+
+        values = await self.cache.get_or_load(self._id_key(user_id), load)
+        return await self.user_repo.from_snapshot(values) if values else None
+
+    async def get_many(self, user_ids: List[int]) -> List[Optional[User]]:
+        """Get users by ID in request order, None where not found"""
+        if self.cache is None:
+            return await self.user_repo.get_many(user_ids)
+
+        # individual cache misses are coalesced into one query by the repository loader
+        return list(await asyncio.gather(*(self.get(user_id) for user_id in user_ids)))
+
+    async def get_many_fields(self, user_ids: List[int], fields: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get selected fields of users by ID in request order, None where not found"""
+        if self.cache is None:
+            return await self.user_repo.get_many_fields(user_ids, fields)
+
+        # serve what the cache holds, fetch only the columns of the rest
+        found = {}
+        misses = []
+        for user_id in dict.fromkeys(user_ids):
+            hit, values = await self.cache.peek(self._id_key(user_id))
+            if hit:
+                found[user_id] = {field: values[field] for field in fields} if values else None
+            else:
+                misses.append(user_id)
+        if misses:
+            found.update(zip(misses, await self.user_repo.get_many_fields(misses, fields)))
+        return [found[user_id] for user_id in user_ids]
 
     async def get_by_email(self, email: str) -> Optional[User]:
         """Get a user by email"""
-        result = await self.user_repo.get_by_email(email)
-        return result
+        values = user_replica.get_by_email(email)
+        if values is not None:
+            return await self.user_repo.from_snapshot(values)
+        if not email_filter.might_exist(email):
+            return None
+
+        if self.cache is None:
+            user = await self.user_repo.get_by_email(email)
+        else:
+            async def load() -> Optional[Dict[str, Any]]:
+                user = await self.user_repo.get_by_email(email)
+                return self.user_repo.to_snapshot(user) if user else None
+
+            values = await self.cache.get_or_load(self._email_key(email), load)
+            user = await self.user_repo.from_snapshot(values) if values else None
+
+        if user is None:
+            email_filter.record_miss()
+        return user
+
+    async def get_updated_at(self, user_id: int) -> Optional[datetime]:
+        """Get the last modification time of a user"""
+        if self.cache is not None:
+            found, values = await self.cache.peek(self._id_key(user_id))
+            if found:
+                return values["updated_at"] if values else None
+        return await self.user_repo.get_updated_at(user_id)
 
-    async def get_all_users(self) -> List[User]:
-        """Get all users"""
-        users, _ = await self.user_repo.get_multi()
+    async def get_version_by_email(self, email: str) -> Optional[Tuple[int, datetime]]:
+        """Get the ID and last modification time of a user by email"""
+        if not email_filter.might_exist(email):
+            return None
+        return await self.user_repo.get_version_by_email(email)
+
+    async def get_all_users_fields(self, fields: Sequence[str]) -> List[Dict[str, Any]]:
+        """Get selected fields of all users"""
+        replicated = user_replica.list_fields(fields)
+        if replicated is not None:
+            return replicated
+        users, _ = await self.user_repo.get_multi_fields(fields)
         return users
 
     async def create(self, obj_in: UserCreate) -> User:
         """Create a new user"""
-        hashed_password = get_password_hash(obj_in.password)        
+        hashed_password = await get_password_hash_async(obj_in.password)
 
         # Create user object
         db_obj = obj_in.dict()
@@ -40,7 +176,46 @@ class UserService:
         if "password" in db_obj:
             del db_obj["password"]
 
-        return await self.user_repo.create(obj_in=db_obj)
+        user = await self.user_repo.create(obj_in=db_obj)
+
+        # drop a cached miss for the new email
+        await self._invalidate(user.id, user.email)
+
+        return user
+
+    async def register(
+        self,
+        obj_in: UserCreate,
+        before_commit: Optional[Callable[[User], Awaitable[None]]] = None
+    ) -> Optional[User]:
+        """
+        Create a user with a single INSERT ... ON CONFLICT DO NOTHING.
+
+        Returns None if the email is taken. before_commit runs inside the
+        transaction once the user is inserted, e.g. to store a response.
+        """
+        # a cached user means the email is taken: skip the hash
+        if self.cache is not None:
+            found, values = await self.cache.peek(self._email_key(obj_in.email))
+            if found and values:
+                return None
+
+        db_obj = obj_in.dict(exclude={"password"})
+        db_obj["hashed_password"] = await get_password_hash_async(obj_in.password)
+
+        user = await self.user_repo.create_if_absent(db_obj, commit_txn=False)
+        if user is None:
+            await self.db.rollback()
+            return None
+
+        if before_commit is not None:
+            await before_commit(user)
+
+        # keep the inserted values: commit expires them
+        values = self.user_repo.to_snapshot(user)
+        await self.db.commit()
+        await self._invalidate(values["id"], values["email"])
+        return await self.user_repo.from_snapshot(values)
 
     async def update(self, user_id: int, obj_in: Union[UserUpdate, dict]) -> Optional[User]:
         """Update a user"""
@@ -57,10 +232,22 @@ class UserService:
 
         # Handle password update separately
         if "password" in filtered_update_data and filtered_update_data["password"]:
-            filtered_update_data["hashed_password"] = get_password_hash(filtered_update_data["password"])
+            filtered_update_data["hashed_password"] = await get_password_hash_async(filtered_update_data["password"])
             del filtered_update_data["password"]  # remove plaintext password
-        
-        return await self.user_repo.update(id=user_id, obj_in=filtered_update_data)
+
+        previous_email = db_obj.email
+        user = await self.user_repo.update(id=user_id, obj_in=filtered_update_data, commit_txn=False)
+        revoked_at = None
+        if TOKEN_INVALIDATING_FIELDS.intersection(filtered_update_data):
+            revoked_at = await self._revoke_tokens(user_id)
+        await self.db.commit()
+        await self.db.refresh(user)
+
+        await self._invalidate(user_id, previous_email, filtered_update_data.get("email"))
+        if revoked_at is not None:
+            revocation_list.revoke(user_id, revoked_at)
+
+        return user
 
     async def delete(self, user_id: int) -> Optional[User]:
         """Delete a user"""
@@ -68,6 +255,37 @@ class UserService:
         if not db_obj:
             return None
 
-        await self.user_repo.delete(id=user_id)
+        email = db_obj.email
+        await self.user_repo.delete(id=user_id, commit_txn=False)
+        revoked_at = await self._revoke_tokens(user_id)
+        await self.db.commit()
+        if self.user_repo.live:
+            await self.db.refresh(db_obj)
+
+        await self._invalidate(user_id, email)
+        if revoked_at is not None:
+            revocation_list.revoke(user_id, revoked_at)
+
+        return db_obj
+
+    async def upgrade_password_hash(self, user_id: int, email: str, password: str, previous_hash: str) -> bool:
+        """Re-hash a verified password with the current cost factor"""
+        new_hash = await get_password_hash_async(password)
+        upgraded = await self.user_repo.replace_password_hash(user_id, previous_hash, new_hash)
+        if upgraded:
+            await self._invalidate(user_id, email)
+        return upgraded
+
+    async def get_password_cost_report(self) -> Dict[str, Any]:
+        """Count users per bcrypt cost factor"""
+        costs: Dict[str, int] = {}
+        for prefix, count in (await self.user_repo.count_by_password_scheme()).items():
+            # bcrypt hashes look like $2b$12$...
+            parts = prefix.split("$")
+            cost = parts[2] if len(parts) > 2 and parts[1].startswith("2") and parts[2].isdigit() else "other"
+            costs[cost] = costs.get(cost, 0) + count
 
-        return db_obj
\ No newline at end of file
+        return {
+            "current_cost": get_password_cost(),
+            "users_by_cost": dict(sorted(costs.items())),
+        }
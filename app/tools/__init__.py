@@ -0,0 +1,2 @@
+# Tools package
+# Contains command line entry points (python -m app.tools.<name>)
@@ -0,0 +1,249 @@
+"""
+Bulk import users from CSV or NDJSON.
+
+Usage:
+    python -m app.tools.import_users users.csv [--format csv|ndjson] [--batch-size 5000]
+        [--workers N] [--rejects users.rejects.ndjson]
+
+Each row needs an email and either a plain password (validated like
+registration and hashed here, across all cores) or a hashed_password holding
+an existing bcrypt hash. Optional: first_name, last_name, role, is_active.
+
+Rows are validated with the registration schema, copied into a temporary
+staging table with COPY and merged into users with one INSERT per batch.
+Emails that already exist (or repeat in the input) are not overwritten.
+Invalid and conflicting rows are written to the rejects file with the
+reason, one JSON object per line.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.schemas.user import UserBase, UserCreate
+
+BCRYPT_HASH = re.compile(r"^\$2[abxy]\$\d{2}\$[./A-Za-z0-9]{53}$")
+STAGING_TABLE = "import_users_staging"
+STAGING_COLUMNS = ["line_no", "email", "hashed_password", "first_name", "last_name", "role", "is_active"]
+PROGRESS_INTERVAL_SECONDS = 5
+
+# first row per email wins, existing live emails are kept
+MERGE = f"""
+    INSERT INTO users (email, hashed_password, first_name, last_name, role, is_active,
+                       is_superuser, is_verified, is_deleted)
+    SELECT DISTINCT ON (lower(email)) email, hashed_password, first_name, last_name, role, is_active,
+           false, false, false
+    FROM {STAGING_TABLE}
+    ORDER BY lower(email), line_no
+    ON CONFLICT (lower(email)) WHERE NOT is_deleted DO NOTHING
+    RETURNING lower(email) AS email
+"""
+# partitioned users: emails are claimed in user_emails first, see UserRepository.create_if_absent
+MERGE_PARTITIONED = f"""
+    WITH staged AS (
+        SELECT DISTINCT ON (lower(email)) lower(email) AS key, *
+        FROM {STAGING_TABLE}
+        ORDER BY lower(email), line_no
+    ), claimed AS (
+        INSERT INTO user_emails (email, user_id)
+        SELECT key, nextval('users_id_seq') FROM staged
+        ON CONFLICT (email) DO NOTHING
+        RETURNING email, user_id
+    )
+    INSERT INTO users (id, email, hashed_password, first_name, last_name, role, is_active,
+                       is_superuser, is_verified, is_deleted)
+    SELECT claimed.user_id, staged.email, staged.hashed_password, staged.first_name, staged.last_name,
+           staged.role, staged.is_active, false, false, false
+    FROM claimed JOIN staged ON staged.key = claimed.email
+    RETURNING lower(email) AS email
+"""
+
+# email, first_name, last_name, role, is_active and either password or hashed_password
+ValidRow = Tuple[int, Dict[str, Any], Optional[str], Optional[str]]
+
+def read_rows(source: TextIO, format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, raw row) without loading the whole input"""
+    if format == "csv":
+        reader = csv.DictReader(source)
+        for row in reader:
+            # empty cells mean "not provided"
+            yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+    else:
+        for line_no, line in enumerate(source, start=1):
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, e
+
+def validate(line_no: int, row: Any) -> Tuple[Optional[ValidRow], Optional[str]]:
+    """
+    Validate one input row.
+
+    Returns:
+        (valid row, None) or (None, reason)
+    """
+    if isinstance(row, Exception):
+        return None, f"invalid JSON: {row}"
+    if not isinstance(row, dict):
+        return None, "row is not an object"
+
+    hashed_password = row.pop("hashed_password", None)
+    try:
+        if hashed_password is not None:
+            if not BCRYPT_HASH.match(hashed_password):
+                return None, "hashed_password is not a bcrypt hash"
+            user = UserBase(**row)
+            password = None
+        else:
+            user = UserCreate(**row)
+            password = user.password
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors())
+
+    fields = user.dict(include={"email", "first_name", "last_name", "role", "is_active"})
+    return (line_no, fields, password, hashed_password), None
+
+class Importer:
+    """Streams validated rows through hashing and COPY into the users table"""
+
+    def __init__(self, batch_size: int, workers: int, rejects: TextIO):
+        self.batch_size = batch_size
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.workers = workers
+        self.rejects = rejects
+        self.read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.started = time.monotonic()
+        self._reported = self.started
+
+    def reject(self, line_no: int, reason: str, email: Optional[str] = None) -> None:
+        self.rejected += 1
+        self.rejects.write(json.dumps({"line": line_no, "email": email, "reason": reason}) + "\n")
+
+    def progress(self, final: bool = False) -> None:
+        now = time.monotonic()
+        if not final and now - self._reported < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._reported = now
+        elapsed = max(now - self.started, 1e-9)
+        print(
+            f"{'done' if final else 'progress'}: read {self.read}, imported {self.imported}, "
+            f"rejected {self.rejected}, {self.read / elapsed:.0f} rows/s, {elapsed:.1f}s",
+            file=sys.stderr,
+        )
+
+    async def hash_batch(self, rows: List[ValidRow]) -> List[tuple]:
+        """Hash plain passwords on the process pool and build COPY records"""
+        passwords = [password for _, _, password, _ in rows if password is not None]
+        loop = asyncio.get_running_loop()
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        hashes = iter(await loop.run_in_executor(
+            None, lambda: list(self.pool.map(get_password_hash, passwords, chunksize=chunksize))
+        ))
+        return [
+            (
+                line_no,
+                fields["email"],
+                hashed_password if password is None else next(hashes),
+                fields["first_name"],
+                fields["last_name"],
+                fields["role"],
+                True if fields["is_active"] is None else fields["is_active"],
+            )
+            for line_no, fields, password, hashed_password in rows
+        ]
+
+    async def load_batch(self, conn, records: List[tuple]) -> None:
+        """COPY a batch into staging and merge it into users in one transaction"""
+        async with conn.transaction():
+            await conn.copy_records_to_table(STAGING_TABLE, records=records, columns=STAGING_COLUMNS)
+            inserted = await conn.fetch(MERGE_PARTITIONED if settings.USERS_PARTITIONS > 0 else MERGE)
+            await conn.execute(f"TRUNCATE {STAGING_TABLE}")
+
+        # the first row per new email was inserted, every other row lost to an existing one
+        new_emails = {row["email"] for row in inserted}
+        for line_no, email, *_ in records:
+            if email.lower() in new_emails:
+                new_emails.discard(email.lower())
+                self.imported += 1
+            else:
+                self.reject(line_no, "email already exists", email)
+
+    async def run(self, rows: Iterator[Tuple[int, Any]]) -> None:
+        from app.db.session import engine
+
+        async with engine.connect() as sa_conn:
+            conn = (await sa_conn.get_raw_connection()).driver_connection
+            await conn.execute(
+                f"""
+                CREATE TEMP TABLE {STAGING_TABLE} (
+                    line_no integer, email varchar(300), hashed_password varchar(300),
+                    first_name varchar(300), last_name varchar(300), role varchar(20), is_active boolean
+                )
+                """
+            )
+
+            loading: Optional[asyncio.Task] = None
+            while True:
+                chunk = list(islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                self.read += len(chunk)
+                valid = []
+                for line_no, row in chunk:
+                    result, reason = validate(line_no, row)
+                    if result is None:
+                        self.reject(line_no, reason, row.get("email") if isinstance(row, dict) else None)
+                    else:
+                        valid.append(result)
+
+                # hash this batch while the previous one is being loaded
+                records = await self.hash_batch(valid) if valid else []
+                if loading is not None:
+                    await loading
+                loading = asyncio.create_task(self.load_batch(conn, records)) if records else None
+                self.progress()
+
+            if loading is not None:
+                await loading
+        await engine.dispose()
+        self.pool.shutdown()
+        self.progress(final=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.import_users", description=__doc__.split("\n")[1])
+    parser.add_argument("path", help="input file, '-' for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes")
+    parser.add_argument("--rejects", help="default: <path>.rejects.ndjson")
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    rejects_path = args.rejects or f"{'import' if args.path == '-' else args.path}.rejects.ndjson"
+
+    source = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    with source, open(rejects_path, "w", encoding="utf-8") as rejects:
+        importer = Importer(args.batch_size, args.workers, rejects)
+        asyncio.run(importer.run(read_rows(source, format)))
+
+    if importer.rejected:
+        print(f"rejected rows written to {rejects_path}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
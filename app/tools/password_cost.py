@@ -0,0 +1,51 @@
+"""
+Size bcrypt on purpose.
+
+Usage:
+    python -m app.tools.password_cost calibrate [--target-ms 250]
+    python -m app.tools.password_cost report
+"""
+import argparse
+import asyncio
+import json
+
+from app.core.config import settings
+from app.core.security import calibrate_password_cost, measure_verify_ms
+
+def calibrate(target_ms: float) -> None:
+    """Print verification latency per cost and the cost fitting the budget"""
+    for rounds in range(settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS + 1):
+        elapsed = measure_verify_ms(rounds, samples=1)
+        print(f"cost {rounds:>2}: {elapsed:8.1f} ms/verify, {1000 / elapsed:7.1f} verifies/s per core")
+        if elapsed > target_ms * 2:
+            break
+
+    rounds = calibrate_password_cost(target_ms)
+    print(f"\nRecommended: BCRYPT_ROUNDS={rounds} (target {target_ms:.0f} ms, current {settings.BCRYPT_ROUNDS})")
+
+async def report() -> None:
+    """Print how many users are hashed at each cost"""
+    from app.db.session import AsyncSessionLocal, engine
+    from app.repositories.user import UserRepository
+    from app.services.user_service import UserService
+
+    async with AsyncSessionLocal() as db:
+        data = await UserService(db, UserRepository(db)).get_password_cost_report()
+    await engine.dispose()
+    print(json.dumps(data, indent=2))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.password_cost", description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = commands.add_parser("calibrate", help="measure bcrypt on this CPU and recommend a cost")
+    calibrate_parser.add_argument("--target-ms", type=float, default=settings.BCRYPT_TARGET_VERIFY_MS)
+    commands.add_parser("report", help="count users per bcrypt cost")
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        calibrate(args.target_ms)
+    else:
+        asyncio.run(report())
+
+if __name__ == "__main__":
+    main()
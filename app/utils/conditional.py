@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple
+
+from fastapi import Request, Response, status
+
+class ResourceVersion(NamedTuple):
+    """Validators describing one version of a resource"""
+    etag: str
+    last_modified: datetime
+
+def _as_utc(value: datetime) -> datetime:
+    # timestamps are stored without timezone, stamped in UTC (see User.updated_at)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def resource_version(id: int, updated_at: datetime) -> ResourceVersion:
+    """
+    Build the validators for a record from its ID and last modification time.
+
+    Args:
+        id: Record ID
+        updated_at: Last modification time of the record
+
+    Returns:
+        Weak ETag and Last-Modified value for the record
+    """
+    updated_at = _as_utc(updated_at)
+    stamp = int(updated_at.timestamp() * 1_000_000)
+    return ResourceVersion(etag=f'W/"{id}-{stamp:x}"', last_modified=updated_at)
+
+def wants_validation(request: Request) -> bool:
+    """Check whether the request carries conditional GET headers"""
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # weak comparison: the W/ prefix is ignored on both sides
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against a resource version.
+
+    If-None-Match takes precedence over If-Modified-Since when both are sent.
+
+    Args:
+        request: The incoming request
+        version: Current version of the resource
+
+    Returns:
+        True if the client copy is still current
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, version.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        # HTTP dates have one second resolution
+        return version.last_modified.replace(microsecond=0) <= _as_utc(since)
+
+    return False
+
+def _validator_headers(version: ResourceVersion) -> dict:
+    return {
+        "ETag": version.etag,
+        "Last-Modified": format_datetime(version.last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+def not_modified_response(version: ResourceVersion) -> Response:
+    """Build an empty 304 response carrying the resource validators"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validator_headers(version))
+
+def with_validators(response: Response, version: ResourceVersion) -> Response:
+    """Attach ETag / Last-Modified headers to a response"""
+    response.headers.update(_validator_headers(version))
+    return response
@@ -0,0 +1,39 @@
+import hashlib
+import hmac
+import json
+from typing import Any, Dict
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.exceptions.http_exceptions import ConflictError
+from app.models.idempotency import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+class IdempotencyKeyTaken(Exception):
+    """Raised when a concurrent request stored its response for the same key first"""
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """
+    Fingerprint a request body to detect a key reused for a different request.
+
+    Keyed with the secret so stored fingerprints can't be used to guess
+    passwords contained in the body.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hmac.new(settings.SECRET_KEY.encode(), canonical.encode(), hashlib.sha256).hexdigest()
+
+def replay_response(record: IdempotencyKey, fingerprint: str) -> JSONResponse:
+    """
+    Rebuild the stored response for a retried request.
+
+    Raises:
+        ConflictError: If the key was used for a different request body
+    """
+    if not hmac.compare_digest(record.fingerprint, fingerprint):
+        raise ConflictError(
+            error_code="IDEMPOTENCY_KEY_REUSED",
+            detail="Idempotency-Key was already used for a different request"
+        )
+    return JSONResponse(status_code=record.status_code, content=record.response, headers={REPLAYED_HEADER: "true"})
@@ -1,6 +1,9 @@
 import json
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
 from typing import Any, Dict, Optional, TypeVar, List
+from app.core.tracing import start_span
 from app.dtos.custom_response_dto import CustomResponse
 from fastapi.encoders import jsonable_encoder
 
@@ -14,11 +17,44 @@ def create_response(
     success: bool = True,
     status_code: int = 200,
 ):
-    response = CustomResponse[T](
-        success=success,
-        data=data,
-        message=message,
-        errors=errors,
-        error_code=error_code
-    )
-    return JSONResponse(status_code=status_code, content=jsonable_encoder(response))
\ No newline at end of file
+    with start_span("serialize response"):
+        response = CustomResponse[T](
+            success=success,
+            data=data,
+            message=message,
+            errors=errors,
+            error_code=error_code
+        )
+        return JSONResponse(status_code=status_code, content=jsonable_encoder(response))
+
+def create_serialized_response(
+    data: Any = None,
+    adapter: Optional[TypeAdapter] = None,
+    message: Optional[str] = None,
+    status_code: int = 200,
+) -> Response:
+    """
+    Build a successful response serializing data straight to JSON bytes.
+
+    Skips building a CustomResponse and running jsonable_encoder over it:
+    data is validated and dumped by a prebuilt TypeAdapter, or, without
+    one, emitted as is (plain dicts, lists and scalars).
+
+    Args:
+        data: Response data, e.g. rows read with Core
+        adapter: Adapter for the type of data
+        message: Optional message
+        status_code: HTTP status code
+
+    Returns:
+        Response with the same body shape as create_response
+    """
+    with start_span("serialize response"):
+        if data is None:
+            body = b"null"
+        elif adapter is not None:
+            body = adapter.dump_json(adapter.validate_python(data))
+        else:
+            body = to_json(data)
+        content = b'{"success":true,"data":%s,"message":%s,"errors":null,"error_code":null}' % (body, to_json(message))
+    return Response(content=content, status_code=status_code, media_type="application/json")
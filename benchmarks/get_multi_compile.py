@@ -0,0 +1,70 @@
+"""
+Statement overhead of BaseRepository.get_multi, without a database.
+
+Compares, per call:
+    rebuilt   building the select + count statements on every call (previous
+              implementation) and computing their cache keys, i.e. the work
+              done when the compiled cache hits
+    compiled  the same plus a full compile, i.e. a compiled cache miss
+    plan      looking up the cached filter plan and binding its parameters
+
+Usage:
+    python -m benchmarks.get_multi_compile [--iterations 5000]
+"""
+import argparse
+import timeit
+from typing import Any, Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from app.models.user import User, UserRole
+from app.repositories.filters import filter_shape, get_filter_plan
+
+FILTERS: Dict[str, Any] = {"role": UserRole.USER, "is_active": True, "first_name_contains": "ann"}
+DIALECT = postgresql.asyncpg.dialect()
+
+def rebuild(filters: Dict[str, Any], skip: int = 0, limit: int = 100):
+    """Statement construction as get_multi did before filter plans"""
+    query = select(User)
+    for field, value in filters.items():
+        if field.endswith("_contains") and value:
+            column = getattr(User, field.replace("_contains", ""))
+            query = query.where(func.lower(column).like(func.lower(f"%{value}%")))
+        elif hasattr(User, field) and value is not None:
+            filter_value = value.value if hasattr(value, "value") else value
+            query = query.where(getattr(User, field) == filter_value)
+    count_query = select(func.count()).select_from(query.subquery())
+    return query.offset(skip).limit(limit), count_query
+
+def run_rebuilt() -> None:
+    for stmt in rebuild(FILTERS):
+        stmt._generate_cache_key()
+
+def run_compiled() -> None:
+    for stmt in rebuild(FILTERS):
+        stmt._generate_cache_key()
+        stmt.compile(dialect=DIALECT)
+
+def run_plan() -> None:
+    plan = get_filter_plan(User, filter_shape(FILTERS))
+    plan.params(FILTERS, 0, 100)
+    plan.select_stmt._generate_cache_key()
+    plan.count_stmt._generate_cache_key()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.get_multi_compile")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    for name, fn, iterations in (
+        ("rebuilt", run_rebuilt, args.iterations),
+        ("compiled", run_compiled, max(1, args.iterations // 10)),
+        ("plan", run_plan, args.iterations),
+    ):
+        fn()
+        elapsed = timeit.timeit(fn, number=iterations)
+        print(f"{name:>8}: {elapsed / iterations * 1e6:9.1f} us/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Insert and lookup throughput of the plain vs hash-partitioned users layout.
+
+Builds both layouts side by side in scratch schemas of the configured
+database (bench_users_plain, bench_users_partitioned), then runs, per layout:
+    insert  registrations as issued by UserRepository.create_if_absent
+    by_id   primary key lookups
+    by_email  lookups by email (through user_emails when partitioned)
+
+The schemas are dropped afterwards unless --keep is given. Needs a Postgres
+database, like the application (POSTGRES_* settings).
+
+Usage:
+    python -m benchmarks.users_partitioning [--users 20000] [--partitions 16] [--concurrency 16] [--keep]
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, List, Sequence
+
+import asyncpg
+
+from app.core.config import settings
+
+COLUMNS = """
+    email varchar(300) NOT NULL,
+    hashed_password varchar(300),
+    first_name varchar(300),
+    last_name varchar(300),
+    is_active boolean NOT NULL DEFAULT true,
+    is_deleted boolean NOT NULL DEFAULT false,
+    deleted_at timestamp,
+    created_at timestamp NOT NULL DEFAULT now(),
+    updated_at timestamp NOT NULL DEFAULT now()
+"""
+SECONDARY_INDEXES = [
+    "CREATE INDEX ix_users_first_name_live ON users (first_name) WHERE NOT is_deleted",
+    "CREATE INDEX ix_users_last_name_live ON users (last_name) WHERE NOT is_deleted",
+    "CREATE INDEX ix_users_deleted_at ON users (deleted_at) WHERE is_deleted",
+]
+
+def plain_ddl(partitions: int) -> List[str]:
+    return [
+        f"CREATE TABLE users (id serial PRIMARY KEY, {COLUMNS})",
+        "CREATE INDEX ix_users_id ON users (id)",
+        "CREATE UNIQUE INDEX uq_users_email_live ON users (lower(email)) WHERE NOT is_deleted",
+        *SECONDARY_INDEXES,
+    ]
+
+def partitioned_ddl(partitions: int) -> List[str]:
+    # same layout as migration 0008
+    return [
+        "CREATE SEQUENCE users_id_seq",
+        f"CREATE TABLE users (id integer NOT NULL DEFAULT nextval('users_id_seq'), {COLUMNS}) PARTITION BY HASH (id)",
+        *(
+            f"CREATE TABLE users_p{r} PARTITION OF users FOR VALUES WITH (MODULUS {partitions}, REMAINDER {r})"
+            for r in range(partitions)
+        ),
+        "ALTER TABLE users ADD PRIMARY KEY (id)",
+        *SECONDARY_INDEXES,
+        "CREATE TABLE user_emails (email varchar(300) PRIMARY KEY, user_id integer NOT NULL)",
+        """
+        CREATE FUNCTION sync_user_email() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_deleted THEN
+                DELETE FROM user_emails WHERE email = lower(OLD.email) AND user_id = OLD.id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_deleted THEN
+                INSERT INTO user_emails (email, user_id) VALUES (lower(NEW.email), NEW.id)
+                ON CONFLICT (email) DO NOTHING;
+                IF NOT FOUND AND NOT EXISTS (
+                    SELECT 1 FROM user_emails WHERE email = lower(NEW.email) AND user_id = NEW.id
+                ) THEN
+                    RAISE EXCEPTION 'duplicate email' USING ERRCODE = 'unique_violation';
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER users_sync_email AFTER INSERT OR UPDATE OF email, is_deleted OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION sync_user_email()
+        """,
+    ]
+
+LAYOUTS = {
+    "plain": {
+        "ddl": plain_ddl,
+        "insert": """
+            INSERT INTO users (email, hashed_password, first_name, last_name) VALUES ($1, $2, $3, $4)
+            ON CONFLICT (lower(email)) WHERE NOT is_deleted DO NOTHING
+            RETURNING id
+        """,
+        "by_email": "SELECT * FROM users WHERE lower(email) = $1 AND NOT is_deleted",
+    },
+    "partitioned": {
+        "ddl": partitioned_ddl,
+        "insert": """
+            WITH claimed AS (
+                INSERT INTO user_emails (email, user_id) VALUES (lower($1::varchar), nextval('users_id_seq'))
+                ON CONFLICT (email) DO NOTHING
+                RETURNING user_id
+            )
+            INSERT INTO users (id, email, hashed_password, first_name, last_name)
+            SELECT user_id, $1::varchar, $2, $3, $4 FROM claimed
+            RETURNING id
+        """,
+        "by_email": """
+            SELECT * FROM users
+            WHERE id = (SELECT user_id FROM user_emails WHERE email = $1) AND NOT is_deleted
+        """,
+    },
+}
+BY_ID = "SELECT * FROM users WHERE id = $1 AND NOT is_deleted"
+# a bcrypt hash's length, the value doesn't matter
+HASH = "$2b$12$" + "x" * 53
+
+async def run_concurrently(
+    pool: asyncpg.Pool,
+    items: Sequence[Any],
+    concurrency: int,
+    fn: Callable[[asyncpg.Connection, Any], Awaitable[Any]],
+) -> float:
+    """Process items with a fixed number of connections, return operations per second"""
+    queue = iter(items)
+
+    async def worker() -> None:
+        async with pool.acquire() as conn:
+            for item in queue:
+                await fn(conn, item)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(items) / (time.perf_counter() - started)
+
+async def bench_layout(dsn: str, name: str, args: argparse.Namespace) -> None:
+    layout = LAYOUTS[name]
+    schema = f"bench_users_{name}"
+
+    admin = await asyncpg.connect(dsn)
+    await admin.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+    await admin.close()
+
+    pool = await asyncpg.create_pool(
+        dsn, min_size=args.concurrency, max_size=args.concurrency, server_settings={"search_path": schema}
+    )
+    try:
+        async with pool.acquire() as conn:
+            for statement in layout["ddl"](args.partitions):
+                await conn.execute(statement)
+
+        emails = [f"user{i}@example.com" for i in range(args.users)]
+        inserts = await run_concurrently(
+            pool, emails, args.concurrency,
+            lambda conn, email: conn.fetchval(layout["insert"], email, HASH, "Bench", "Mark"),
+        )
+        async with pool.acquire() as conn:
+            await conn.execute("ANALYZE")
+            ids = [row["id"] for row in await conn.fetch("SELECT id FROM users")]
+
+        lookups = args.users * 2
+        by_id = await run_concurrently(
+            pool, random.choices(ids, k=lookups), args.concurrency,
+            lambda conn, id: conn.fetchrow(BY_ID, id),
+        )
+        by_email = await run_concurrently(
+            pool, random.choices(emails, k=lookups), args.concurrency,
+            lambda conn, email: conn.fetchrow(layout["by_email"], email),
+        )
+        print(f"{name:>12}: insert {inserts:9.0f}/s  by_id {by_id:9.0f}/s  by_email {by_email:9.0f}/s")
+    finally:
+        await pool.close()
+        if not args.keep:
+            admin = await asyncpg.connect(dsn)
+            await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+            await admin.close()
+
+async def main_async(args: argparse.Namespace) -> None:
+    dsn = settings.SQLALCHEMY_DATABASE_URI.replace("postgresql+asyncpg://", "postgresql://", 1)
+    for name in LAYOUTS:
+        await bench_layout(dsn, name, args)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.users_partitioning")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schemas")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
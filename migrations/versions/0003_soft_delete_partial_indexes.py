@@ -0,0 +1,78 @@
+"""soft delete: partial indexes and users_archive table
+
+Replaces the full indexes on email and names with partial indexes covering
+live rows only, so soft-deleted users neither bloat them nor block an email
+from being registered again. Email uniqueness becomes case insensitive.
+
+The indexes are built inside the migration transaction; on a large table
+build them beforehand with CREATE INDEX CONCURRENTLY under the same names.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE users SET deleted_at = updated_at WHERE is_deleted")
+
+    op.create_index(
+        "uq_users_email_live", "users", [sa.text("lower(email)")],
+        unique=True, postgresql_where=sa.text("NOT is_deleted"),
+    )
+    op.create_index("ix_users_first_name_live", "users", ["first_name"], postgresql_where=sa.text("NOT is_deleted"))
+    op.create_index("ix_users_last_name_live", "users", ["last_name"], postgresql_where=sa.text("NOT is_deleted"))
+    op.create_index("ix_users_deleted_at", "users", ["deleted_at"], postgresql_where=sa.text("is_deleted"))
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_first_name", table_name="users")
+    op.drop_index("ix_users_last_name", table_name="users")
+
+    op.create_table(
+        "users_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("email", sa.String(length=300), nullable=False),
+        sa.Column("hashed_password", sa.String(length=300), nullable=True),
+        sa.Column("first_name", sa.String(length=300), nullable=True),
+        sa.Column("last_name", sa.String(length=300), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_archive_email", "users_archive", ["email"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_archive_email", table_name="users_archive")
+    op.drop_table("users_archive")
+
+    # soft-deleted rows may share an email with a live one; they can't survive the full unique index
+    op.execute("DELETE FROM users WHERE is_deleted")
+    op.create_index("ix_users_last_name", "users", ["last_name"])
+    op.create_index("ix_users_first_name", "users", ["first_name"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.drop_index("ix_users_deleted_at", table_name="users")
+    op.drop_index("ix_users_last_name_live", table_name="users")
+    op.drop_index("ix_users_first_name_live", table_name="users")
+    op.drop_index("uq_users_email_live", table_name="users")
+    op.drop_column("users", "deleted_at")
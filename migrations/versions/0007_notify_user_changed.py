@@ -0,0 +1,66 @@
+"""notify user_changed on user updates and deletes
+
+Every update that changes updated_at (all writes through the application;
+login activity keeps it on purpose) and every delete of a live user sends
+a notification on the user_changed channel, delivered at commit. Workers
+listen on it to evict their cached copies of the user.
+
+The payload is JSON: {"id": ..., "emails": [old, new], "at": epoch seconds}.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE FUNCTION notify_user_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('user_changed', json_build_object(
+                'id', OLD.id,
+                'emails', json_build_array(OLD.email, CASE WHEN TG_OP = 'UPDATE' THEN NEW.email END),
+                'at', extract(epoch from clock_timestamp())
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_notify_changed_update AFTER UPDATE ON users
+        FOR EACH ROW
+        WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted)
+        EXECUTE FUNCTION notify_user_changed()
+        """
+    )
+    # soft-deleted rows were evicted when they were deleted; archiving them stays silent
+    op.execute(
+        """
+        CREATE TRIGGER users_notify_changed_delete AFTER DELETE ON users
+        FOR EACH ROW
+        WHEN (NOT OLD.is_deleted)
+        EXECUTE FUNCTION notify_user_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER users_notify_changed_delete ON users")
+    op.execute("DROP TRIGGER users_notify_changed_update ON users")
+    op.execute("DROP FUNCTION notify_user_changed()")
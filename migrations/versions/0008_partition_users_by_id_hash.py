@@ -0,0 +1,147 @@
+"""optionally hash-partition users by id
+
+Only runs when USERS_PARTITIONS is set to the number of partitions (the
+application must run with the same value); otherwise it is a no-op and
+users stays a plain table.
+
+A unique index on a partitioned table has to contain the partition key, so
+live email uniqueness moves to user_emails (lower(email) -> id), kept in
+sync by a trigger on users. Email lookups resolve the id there first and
+scan a single partition.
+
+The rows are copied inside the migration transaction, with the table
+locked; on a large table run it in a maintenance window.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the setting the application reads, so schema and repository agree
+PARTITIONS = settings.USERS_PARTITIONS
+
+NOTIFY_TRIGGERS = [
+    """
+    CREATE TRIGGER users_notify_changed_update AFTER UPDATE ON users
+    FOR EACH ROW
+    WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted)
+    EXECUTE FUNCTION notify_user_changed()
+    """,
+    """
+    CREATE TRIGGER users_notify_changed_delete AFTER DELETE ON users
+    FOR EACH ROW
+    WHEN (NOT OLD.is_deleted)
+    EXECUTE FUNCTION notify_user_changed()
+    """,
+]
+
+
+def _is_partitioned() -> bool:
+    result = op.get_bind().execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'users'::regclass)")
+    )
+    return bool(result.scalar())
+
+
+def _replace_users_table(create_table: str) -> None:
+    """Swap users for a new, empty layout and copy the rows over"""
+    op.execute("ALTER TABLE users RENAME TO users_old")
+    op.execute(create_table)
+    op.execute("INSERT INTO users SELECT * FROM users_old")
+    # the id sequence has to survive dropping the old table
+    op.execute("ALTER SEQUENCE users_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE users_old")
+    op.execute("ALTER SEQUENCE users_id_seq OWNED BY users.id")
+    op.execute("ALTER TABLE users ADD PRIMARY KEY (id)")
+
+
+def _create_secondary_indexes() -> None:
+    op.create_index("ix_users_first_name_live", "users", ["first_name"], postgresql_where=sa.text("NOT is_deleted"))
+    op.create_index("ix_users_last_name_live", "users", ["last_name"], postgresql_where=sa.text("NOT is_deleted"))
+    op.create_index("ix_users_deleted_at", "users", ["deleted_at"], postgresql_where=sa.text("is_deleted"))
+    for trigger in NOTIFY_TRIGGERS:
+        op.execute(trigger)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if PARTITIONS <= 0:
+        return
+
+    _replace_users_table("CREATE TABLE users (LIKE users_old INCLUDING DEFAULTS) PARTITION BY HASH (id)")
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE users_p{remainder} PARTITION OF users "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    _create_secondary_indexes()
+
+    op.create_table(
+        "user_emails",
+        sa.Column("email", sa.String(length=300), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("email"),
+    )
+    op.execute("INSERT INTO user_emails (email, user_id) SELECT lower(email), id FROM users WHERE NOT is_deleted")
+
+    # claims by UserRepository.create_if_absent already map the email to the new id
+    op.execute(
+        """
+        CREATE FUNCTION sync_user_email() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_deleted THEN
+                DELETE FROM user_emails WHERE email = lower(OLD.email) AND user_id = OLD.id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_deleted THEN
+                INSERT INTO user_emails (email, user_id) VALUES (lower(NEW.email), NEW.id)
+                ON CONFLICT (email) DO NOTHING;
+                IF NOT FOUND AND NOT EXISTS (
+                    SELECT 1 FROM user_emails WHERE email = lower(NEW.email) AND user_id = NEW.id
+                ) THEN
+                    RAISE EXCEPTION 'duplicate key value violates unique constraint "user_emails_pkey"'
+                        USING ERRCODE = 'unique_violation', CONSTRAINT = 'user_emails_pkey',
+                              DETAIL = format('Key (email)=(%s) already exists.', lower(NEW.email));
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_sync_email AFTER INSERT OR UPDATE OF email, is_deleted OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION sync_user_email()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_partitioned():
+        return
+
+    _replace_users_table("CREATE TABLE users (LIKE users_old INCLUDING DEFAULTS)")
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index(
+        "uq_users_email_live", "users", [sa.text("lower(email)")],
+        unique=True, postgresql_where=sa.text("NOT is_deleted"),
+    )
+    _create_secondary_indexes()
+
+    op.drop_table("user_emails")
+    op.execute("DROP FUNCTION sync_user_email()")
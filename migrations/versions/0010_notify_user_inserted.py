@@ -0,0 +1,60 @@
+"""notify user_changed on user inserts
+
+Registrations on one worker have to reach the others right away: the email
+filter of every worker may only answer "no such user" for emails it would
+have heard about. Inserts now notify too, and drop cached misses of the
+new email on the way.
+
+The payload keeps the format of 0007; for inserts "emails" holds the new
+email only.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_user_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('user_changed', json_build_object(
+                'id', CASE WHEN TG_OP = 'INSERT' THEN NEW.id ELSE OLD.id END,
+                'emails', CASE TG_OP
+                    WHEN 'INSERT' THEN json_build_array(NEW.email)
+                    WHEN 'UPDATE' THEN json_build_array(OLD.email, NEW.email)
+                    ELSE json_build_array(OLD.email, NULL)
+                END,
+                'at', extract(epoch from clock_timestamp())
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_notify_changed_insert AFTER INSERT ON users
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_user_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER users_notify_changed_insert ON users")
+    # the 0007 function only handles updates and deletes, which it still gets
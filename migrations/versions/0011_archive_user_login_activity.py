@@ -0,0 +1,34 @@
+"""archive users' login activity
+
+users_archive gets the last_login_at and login_count columns of users
+(0005), so archived users keep their login history. Users archived before
+this migration have no last login and a count of zero.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users_archive", sa.Column("last_login_at", sa.DateTime(), nullable=True))
+    op.add_column("users_archive", sa.Column("login_count", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users_archive", "login_count")
+    op.drop_column("users_archive", "last_login_at")
@@ -0,0 +1,37 @@
+"""stamp users.created_at and updated_at in UTC
+
+The columns have no time zone, and now() wrote them in the session's
+TimeZone; readers (Last-Modified, ETags) take them as UTC. The defaults
+now use timezone('utc', now()), as the application does on update.
+
+Existing rows are left as they are: on a server whose TimeZone isn't UTC
+their stamps stay off by the offset until the row is next updated.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, Sequence[str], None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in ("created_at", "updated_at"):
+        op.alter_column("users", column, server_default=sa.text("timezone('utc', now())"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in ("created_at", "updated_at"):
+        op.alter_column("users", column, server_default=sa.text("now()"))
@@ -0,0 +1,30 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+
+@pytest.fixture
+def sessionmaker_factory():
+    """Session factory bound to a fresh SQLite database file, so sessions use separate connections"""
+    directory = tempfile.TemporaryDirectory()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory.name, 'test.db')}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def add_functions(dbapi_connection, connection_record) -> None:
+        # SQLite's CURRENT_TIMESTAMP is in UTC already
+        dbapi_connection.create_function("timezone", 2, lambda zone, value: value)
+
+    async def create_schema() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    yield sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+    directory.cleanup()
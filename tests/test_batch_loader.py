@@ -0,0 +1,52 @@
+import asyncio
+
+from app.repositories.loader import BatchLoader
+
+def test_batches_are_combined():
+    calls = []
+
+    async def batch_fn(keys):
+        calls.append(keys)
+        return [key * 2 for key in keys]
+
+    async def scenario() -> None:
+        loader = BatchLoader(batch_fn)
+        assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [2, 4, 2]
+
+    asyncio.run(scenario())
+    assert calls == [[1, 2]]
+
+def test_batch_is_cancelled_when_every_caller_is():
+    cancelled = []
+
+    async def scenario() -> None:
+        started = asyncio.Event()
+
+        async def batch_fn(keys):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(keys)
+                raise
+            return keys
+
+        loader = BatchLoader(batch_fn)
+
+        async def caller(key):
+            return await loader.load(key)
+
+        callers = [asyncio.create_task(caller(key)) for key in (1, 2)]
+        await started.wait()
+
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        assert not cancelled
+
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled == [[1, 2]]
+        assert not loader._tasks
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from app.core.config import settings
+from app.repositories.user import UserRepository
+from app.services import cache_invalidation
+from app.services import email_filter as email_filter_module
+from app.services.cache_invalidation import InvalidationListener
+from app.services.email_filter import EmailFilter
+
+def test_misses_are_only_trusted_while_the_listener_covers_new_users(sessionmaker_factory, monkeypatch):
+    monkeypatch.setattr(email_filter_module, "AsyncSessionLocal", sessionmaker_factory)
+    monkeypatch.setattr(settings, "EMAIL_FILTER_MAX_STALENESS_SECONDS", 60.0)
+
+    async def scenario() -> None:
+        async with sessionmaker_factory() as db:
+            await UserRepository(db).create(obj_in={"email": "known@example.com"})
+
+        email_filter = EmailFilter()
+        await email_filter.rebuild()
+        # a user registered elsewhere can't be told apart without the listener
+        assert email_filter.might_exist("unknown@example.com")
+
+        email_filter.listening_started()
+        # notifications before LISTEN are lost: the filter needs a sync after it
+        assert email_filter.might_exist("unknown@example.com")
+
+        await email_filter.poll()
+        assert email_filter.might_exist("Known@example.com")
+        assert not email_filter.might_exist("unknown@example.com")
+
+        email_filter.listening_stopped()
+        assert email_filter.might_exist("unknown@example.com")
+
+    asyncio.run(scenario())
+
+def test_insert_notifications_add_the_new_email(sessionmaker_factory, monkeypatch):
+    monkeypatch.setattr(email_filter_module, "AsyncSessionLocal", sessionmaker_factory)
+    monkeypatch.setattr(settings, "EMAIL_FILTER_MAX_STALENESS_SECONDS", 60.0)
+
+    email_filter = EmailFilter()
+    monkeypatch.setattr(cache_invalidation, "email_filter", email_filter)
+
+    async def scenario() -> None:
+        await email_filter.rebuild()
+        email_filter.listening_started()
+        await email_filter.poll()
+        assert not email_filter.might_exist("new@example.com")
+
+        payload = json.dumps({"id": 1, "emails": ["new@example.com"], "at": 0})
+        await InvalidationListener()._on_notification(None, 0, "user_changed", payload)
+        assert email_filter.might_exist("new@example.com")
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+import asyncio
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.user import User
+from app.repositories.user import UserRepository
+
+def test_read_after_write_in_one_transaction_sees_the_write(sessionmaker_factory, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_ENABLED", True)
+
+    async def scenario() -> None:
+        async with sessionmaker_factory() as db:
+            await UserRepository(db).create(obj_in={"email": "reader@example.com", "first_name": "Old"})
+
+        async with sessionmaker_factory() as db:
+            repo = UserRepository(db)
+            # a Core statement leaves nothing in new/dirty/deleted
+            await db.execute(update(User).where(User.email == "reader@example.com").values(first_name="New"))
+            assert db.in_transaction()
+            assert not repo._can_share_reads()
+
+            user = await repo.get_by_email("reader@example.com")
+            assert user.first_name == "New"
+
+    asyncio.run(scenario())
+
+def test_reads_outside_a_transaction_are_shared(sessionmaker_factory, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_ENABLED", True)
+
+    async def scenario() -> None:
+        async with sessionmaker_factory() as db:
+            await UserRepository(db).create(obj_in={"email": "shared@example.com"})
+
+        executed = metrics.counter("singleflight.users.get_by_email.executed")
+        before = executed.value
+        async with sessionmaker_factory() as db:
+            repo = UserRepository(db)
+            assert repo._can_share_reads()
+            user = await repo.get_by_email("shared@example.com")
+            assert user.email == "shared@example.com"
+        assert executed.value == before + 1
+
+    asyncio.run(scenario())
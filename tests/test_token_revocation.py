@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from app.models.user import User
+from app.repositories.revocation import RevocationRepository
+from app.repositories.user import UserRepository
+from app.services.user_service import UserService
+
+class FailingRevocationRepository(RevocationRepository):
+    async def revoke(self, user_id: int, commit_txn: bool = True):
+        raise RuntimeError("revocation failed")
+
+async def get_by_primary_key(self, id):
+    # the batched lookup uses = ANY(array), which SQLite lacks
+    return await self.db.get(User, id)
+
+def test_failed_revocation_rolls_back_the_user_update(sessionmaker_factory, monkeypatch):
+    monkeypatch.setattr(UserRepository, "get", get_by_primary_key)
+
+    async def scenario() -> None:
+        async with sessionmaker_factory() as db:
+            user = await UserRepository(db).create(obj_in={"email": "old@example.com"})
+            user_id = user.id
+
+        async with sessionmaker_factory() as db:
+            service = UserService(db, UserRepository(db), revocation_repo=FailingRevocationRepository(db))
+            with pytest.raises(RuntimeError):
+                await service.update(user_id, {"email": "new@example.com"})
+
+        async with sessionmaker_factory() as db:
+            user = await UserRepository(db).get(user_id)
+            assert user.email == "old@example.com"
+
+    asyncio.run(scenario())
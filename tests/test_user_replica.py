@@ -0,0 +1,31 @@
+import asyncio
+
+from app.core.config import settings
+from app.repositories.user import UserRepository
+from app.services import user_replica as user_replica_module
+from app.services.user_replica import UserReplica
+
+def test_poll_applies_rows_of_the_overlap_once(sessionmaker_factory, monkeypatch):
+    monkeypatch.setattr(user_replica_module, "AsyncSessionLocal", sessionmaker_factory)
+    monkeypatch.setattr(settings, "SYNC_OVERLAP_SECONDS", 3600.0)
+
+    async def scenario() -> None:
+        async with sessionmaker_factory() as db:
+            await UserRepository(db).create(obj_in={"email": "first@example.com"})
+
+        replica = UserReplica()
+        await replica.load()
+        applied = replica._changes.value
+
+        async with sessionmaker_factory() as db:
+            await UserRepository(db).create(obj_in={"email": "second@example.com"})
+
+        # both users are within the overlap, only the new one is applied
+        await replica.poll()
+        assert replica._changes.value == applied + 1
+        assert replica.get_by_email("second@example.com")["email"] == "second@example.com"
+
+        await replica.poll()
+        assert replica._changes.value == applied + 1
+
+    asyncio.run(scenario())